@@ -0,0 +1,5 @@
+"""
+Performance benchmarks over synthetic compound files. Suites are written in
+asv style (`time_*` and `peakmem_*` methods, `params`), so they can be run by
+airspeed velocity or by bundled runner: python -m benchmarks [pattern]
+"""
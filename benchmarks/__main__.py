@@ -0,0 +1,71 @@
+"""
+Minimal runner of asv-style suites for environments without asv. Prints
+best time of few repeats for `time_*` benchmarks, peak of traced Python
+allocations for `peakmem_*` ones and value returned by `track_*` ones.
+"""
+from inspect import isclass
+from itertools import product
+from sys import argv, stdout
+from timeit import default_timer
+from tracemalloc import get_traced_memory, start, stop
+
+from benchmarks import benchmarks
+
+REPEATS = 5
+
+
+def measure(method, args):
+    """ Returns human readable result of single benchmark run """
+    if method.__name__.startswith("track_"):
+        return "%s %s" % (method(*args), getattr(method, "unit", "unit"))
+    if method.__name__.startswith("peakmem_"):
+        start()
+        method(*args)
+        peak = get_traced_memory()[1]
+        stop()
+        return "%.1f KiB" % (peak / 1024.)
+
+    best = None
+    for _ in range(REPEATS):
+        started = default_timer()
+        method(*args)
+        elapsed = default_timer() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return "%.3f ms" % (best * 1000)
+
+
+def main(pattern=""):
+    """
+    Runs every benchmark, which full name contains `pattern`. Suites
+    without `params` are run once without arguments, suites, which setup
+    raises NotImplementedError, are skipped like asv does.
+    """
+    for name, suite in sorted(vars(benchmarks).items()):
+        if not isclass(suite) or suite.__module__ != benchmarks.__name__:
+            continue
+
+        for args in product(*getattr(suite, "params", ())):
+            methods = [(method, "%s.%s%r" % (name, method, args))
+                       for method in sorted(dir(suite))
+                       if method.startswith(("time_", "peakmem_", "track_"))]
+            methods = [item for item in methods if pattern in item[1]]
+            if not methods:
+                continue
+
+            instance = suite()
+            try:
+                if hasattr(instance, "setup"):
+                    instance.setup(*args)
+            except NotImplementedError as error:
+                for _, full_name in methods:
+                    stdout.write("%-60s skipped: %s\n" % (full_name, error))
+                continue
+            for method, full_name in methods:
+                result = measure(getattr(instance, method), args)
+                stdout.write("%-60s %s\n" % (full_name, result))
+            if hasattr(instance, "teardown"):
+                instance.teardown(*args)
+
+
+if __name__ == "__main__":
+    main(*argv[1:2])
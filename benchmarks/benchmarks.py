@@ -0,0 +1,378 @@
+""" Benchmark suites for CfbIO, Directory and Entry hot paths """
+import gc
+from importlib.util import find_spec
+from os import listdir, makedirs, remove
+from os.path import exists, isdir, join
+from random import Random
+from shutil import copyfile, rmtree
+from sys import platform
+from tempfile import gettempdir, mkdtemp
+from warnings import simplefilter
+
+from cfb import CfbIO, CfbPool, probe
+from cfb.cache import IndexCache
+from cfb.export import columns, to_numpy
+from cfb.vba import VbaProject
+from tests.generator import SyntheticCfb, temporary_file, vba_project
+
+simplefilter("ignore")
+
+
+def open_files():
+    """ Count of opened descriptors of process, None if it's unknown """
+    for directory in ("/proc/self/fd", "/dev/fd"):
+        if isdir(directory):
+            return len(listdir(directory))
+    return None
+
+
+def resident_size():
+    """
+    Resident set size of process in KiB. Current size is read from
+    /proc/self/statm, peak one from getrusage() is used without it.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        from os import sysconf
+        return pages * sysconf("SC_PAGE_SIZE") // 1024
+    except (IOError, OSError):
+        from resource import getrusage, RUSAGE_SELF
+        peak = getrusage(RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if platform == "darwin" else peak
+
+
+def synthetic(**kwargs):
+    """
+    Returns filename of synthetic file built with `kwargs`. Generator is
+    deterministic, so files are cached between runs in temporary directory.
+    """
+    directory = join(gettempdir(), "cfb-benchmarks")
+    if not exists(directory):
+        makedirs(directory)
+
+    name = "-".join("%s=%s" % item for item in sorted(kwargs.items()))
+    filename = join(directory, name + ".cfb")
+    if not exists(filename):
+        SyntheticCfb(**kwargs).save(filename)
+    return filename
+
+
+class Open(object):
+    """ Opening files with many directory entries """
+    params = ([3, 4], [16, 1024])
+    param_names = ["version", "streams"]
+
+    def setup(self, version, streams):
+        """ Prepares file with `streams` normal and mini streams """
+        self.generator = SyntheticCfb(version=version, streams=streams,
+                                      stream_size=4096, mini_streams=streams)
+        self.filename = synthetic(version=version, streams=streams,
+                                  stream_size=4096, mini_streams=streams)
+
+    def time_open(self, *_):
+        """ Header and root entry only """
+        CfbIO(self.filename, lazy=True).close()
+
+    def time_directory_load(self, *_):
+        """ Whole directory tree """
+        CfbIO(self.filename).close()
+
+    def time_by_name(self, *_):
+        """ Named access to every stream of lazy opened file """
+        io = CfbIO(self.filename, lazy=True)
+        for path in self.generator.paths:
+            io.directory.by_name(path)
+        io.close()
+
+    def peakmem_directory_load(self, *_):
+        """ Memory used by whole directory tree """
+        CfbIO(self.filename).close()
+
+
+class Lifecycle(object):
+    """ Opening and dropping many files without closing them """
+    count = 100000
+
+    def setup(self):
+        """ Uses small real document, warms allocator up """
+        if open_files() is None:
+            raise NotImplementedError("needs /proc/self/fd or /dev/fd")
+        self.filename = "tests/data/simple.doc"
+        self.open_drop(1000)
+
+    def open_drop(self, count):
+        """ Files and directories must be freed without garbage collector """
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(count):
+                opened = CfbIO(self.filename, lazy=True)
+                opened["WordDocument"].read(16)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def track_open_files(self):
+        """ Growth of opened descriptors count """
+        before = open_files()
+        self.open_drop(self.count)
+        return open_files() - before
+
+    track_open_files.unit = "descriptors"
+
+    def track_resident_size(self):
+        """ Growth of resident set size """
+        before = resident_size()
+        self.open_drop(self.count)
+        return resident_size() - before
+
+    track_resident_size.unit = "KiB"
+
+
+class Pool(object):
+    """ Random access to many files sharing few descriptors """
+    params = ([4, 64],)
+    param_names = ["max_open"]
+
+    def setup(self, max_open):
+        """ Opens 64 copies of file in pool """
+        self.directory = mkdtemp()
+        source = synthetic(streams=4, stream_size=65536)
+        self.pool = CfbPool(max_open=max_open)
+        self.files = []
+        for number in range(64):
+            name = join(self.directory, "%02d.cfb" % number)
+            copyfile(source, name)
+            self.files.append(self.pool.open(name))
+        self.entries = [opened["Stream0001"] for opened in self.files]
+
+    def teardown(self, _):
+        """ Closes pooled descriptors """
+        self.pool.close()
+        rmtree(self.directory)
+
+    def time_round_robin(self, _):
+        """ Short read from every file in turn """
+        for entry in self.entries:
+            entry.read_ranges([(4096, 16)])
+
+
+class Export(object):
+    """ Directory metadata of many files as columns """
+    files = 32
+
+    def setup(self):
+        """ Uses same file with 1024 streams many times """
+        self.sources = [synthetic(streams=512, stream_size=4096,
+                                  mini_streams=512)] * self.files
+
+    def time_entries(self):
+        """ Entry objects with converted times, for comparison """
+        for name in self.sources:
+            with CfbIO(name) as io:
+                for entry in io.directory.values():
+                    (entry.name, entry.size, entry.clsid,
+                     entry.creation_time, entry.modified_time)
+
+    def time_columns(self):
+        """ Pure Python columns """
+        columns(self.sources)
+
+
+class ExportNumpy(object):
+    """ Directory metadata of many files as NumPy array, NumPy is optional """
+    def setup(self):
+        """ Uses same sources as Export """
+        if find_spec("numpy") is None:
+            raise NotImplementedError("needs numpy")
+        self.sources = [synthetic(streams=512, stream_size=4096,
+                                  mini_streams=512)] * Export.files
+
+    def time_numpy(self):
+        """ NumPy structured array with converted times """
+        to_numpy(self.sources)
+
+
+class Difat(object):
+    """ Opening files, which FAT is addressed by DIFAT sectors chain """
+    params = ([0, 1, 4],)
+    param_names = ["difat_sectors"]
+
+    def setup(self, difat_sectors):
+        """ Prepares file with `difat_sectors` long DIFAT chain """
+        self.filename = synthetic(difat_sectors=difat_sectors, streams=64)
+
+    def time_directory_load(self, _):
+        """ Whole directory tree """
+        CfbIO(self.filename).close()
+
+
+class Read(object):
+    """ Reading big stream stored in normal sectors """
+    params = ([3, 4], [0.0, 0.5])
+    param_names = ["version", "fragmentation"]
+    size = 2 ** 20
+
+    def setup(self, version, fragmentation):
+        """ Opens file with two big streams and precomputes seeks """
+        self.io = CfbIO(synthetic(version=version, streams=2,
+                                  stream_size=self.size,
+                                  fragmentation=fragmentation))
+        self.entry = self.io["Stream0001"]
+
+        random = Random(0)
+        self.offsets = [random.randrange(self.size) for _ in range(64)]
+
+    def teardown(self, *_):
+        """ Closes opened file """
+        self.io.close()
+
+    def time_sequential_read(self, *_):
+        """ Stream read by 64KiB blocks """
+        self.entry.seek(0)
+        while self.entry.read(2 ** 16):
+            pass
+
+    def time_random_seek(self, *_):
+        """ Seek latency, each seek follows by short read """
+        for offset in self.offsets:
+            self.entry.seek(offset)
+            self.entry.read(16)
+
+    def time_read_ranges(self, *_):
+        """ Same short pieces read at once by vectored read """
+        self.entry.read_ranges([(offset, 16) for offset in self.offsets])
+
+    def peakmem_full_read(self, *_):
+        """ Memory used to read whole stream at once """
+        self.entry.seek(0)
+        self.entry.read()
+
+
+class ReadMini(object):
+    """ Reading small streams stored in mini stream """
+    params = ([3, 4],)
+    param_names = ["version"]
+
+    def setup(self, version):
+        """ Opens file with many mini streams """
+        self.generator = SyntheticCfb(version=version, streams=0,
+                                      mini_streams=256, mini_size=1000)
+        self.io = CfbIO(synthetic(version=version, streams=0,
+                                  mini_streams=256, mini_size=1000))
+
+    def teardown(self, _):
+        """ Closes opened file """
+        self.io.close()
+
+    def time_sequential_read(self, _):
+        """ Every mini stream read whole """
+        for path in self.generator.paths:
+            entry = self.io[path]
+            entry.seek(0)
+            entry.read()
+
+
+class Chain(object):
+    """ Following FAT chains, cost of single hop """
+    params = ([3, 4], [0.0, 1.0])
+    param_names = ["version", "fragmentation"]
+
+    def setup(self, version, fragmentation):
+        """ Opens file with one big stream """
+        self.io = CfbIO(synthetic(version=version, streams=1,
+                                  stream_size=2 ** 21,
+                                  fragmentation=fragmentation))
+        self.start = self.io["Stream0000"].sector_start
+        self.sectors = self.io.chain(self.start)
+
+    def teardown(self, *_):
+        """ Closes opened file """
+        self.io.close()
+
+    def time_fat_hops(self, *_):
+        """ Every hop separately """
+        for sector in self.sectors:
+            self.io.next_fat(sector)
+
+    def time_chain(self, *_):
+        """ Whole chain at once """
+        self.io.chain(self.start)
+
+
+class Index(object):
+    """ Opening files with persistent index cache """
+    params = ([3, 4], [1024, 8192])
+    param_names = ["version", "streams"]
+
+    def setup(self, version, streams):
+        """ Prepares file and warms index cache up """
+        self.filename = synthetic(version=version, streams=streams,
+                                  stream_size=4096)
+        self.cache = IndexCache(mkdtemp())
+        CfbIO(self.filename, index_cache=self.cache).close()
+
+    def teardown(self, *_):
+        """ Drops index cache """
+        rmtree(self.cache.directory)
+
+    def time_open_uncached(self, *_):
+        """ Whole directory tree parsed from file """
+        CfbIO(self.filename).close()
+
+    def time_open_cached(self, *_):
+        """ Tables and directory loaded from index """
+        CfbIO(self.filename, index_cache=self.cache).close()
+
+
+class Vba(object):
+    """ Decompressing source of big VBA modules """
+    params = ([2 ** 16, 2 ** 20],)
+    param_names = ["size"]
+
+    def setup(self, size):
+        """ Saves file with VBA project of one `size` bytes long module """
+        line = 'Debug.Print "Line " & i & " of generated module"\r\n'
+        code = (line * (size // len(line) + 1))[:size]
+        self.filename = temporary_file()
+        SyntheticCfb(streams=0, files=vba_project(
+            {"Module1": code})).save(self.filename)
+        self.io = CfbIO(self.filename)
+
+    def teardown(self, _):
+        """ Closes and removes file """
+        self.io.close()
+        remove(self.filename)
+
+    def time_open_project(self, _):
+        """ Only dir stream is decompressed """
+        VbaProject(self.io)
+
+    def time_module_source(self, _):
+        """ Whole module source decompressed and decoded """
+        VbaProject(self.io).read("Module1")
+
+    def peakmem_module_chunks(self, _):
+        """ Memory used to stream module source chunk by chunk """
+        for _ in VbaProject(self.io).chunks("Module1"):
+            pass
+
+
+class Probe(object):
+    """ Triage of many files: is it compound file and which one """
+    params = ([3, 4],)
+    param_names = ["version"]
+
+    def setup(self, version):
+        """ Prepares file with many entries """
+        self.filename = synthetic(version=version, streams=1024,
+                                  stream_size=4096)
+
+    def time_probe(self, _):
+        """ Header and root entry record only """
+        probe(self.filename)
+
+    def time_open_lazy(self, _):
+        """ Lazy opened file for comparison """
+        CfbIO(self.filename, lazy=True).close()
@@ -1,101 +1,58 @@
 """ Compound File Binary Format IO module (currently read-only) """
 from io import FileIO
 from os import fstat
-from six import string_types
 
-from cfb.constants import ENDOFCHAIN
-from cfb.directory import Directory
-from cfb.directory.entry import RootEntry
-from cfb.exceptions import MaybeDefected, ErrorDefect
-from cfb.header import Header
-from cfb.helpers import ByteHelpers, cached
+try:
+    from os import pread
+except ImportError:
+    pread = None
 
-__all__ = ["CfbIO"]
+from cfb.compare import diff
+from cfb.compound import CompoundFile
+from cfb.exceptions import ErrorDefect
+from cfb.pool import CfbPool
+from cfb.probe import probe
+from cfb.stats import Stats
+from cfb.stream import CfbStream
 
+__all__ = ["CfbIO", "CfbPool", "CfbStream", "Stats", "diff", "probe"]
 
-class CfbIO(FileIO, MaybeDefected, ByteHelpers):
+
+class CfbIO(FileIO, CompoundFile):
     """
     Creates IO (currently read-only) object for accessing internal structure
-    of Microsoft Compound File Binary Format Files.
+    of Microsoft Compound File Binary Format Files. See CompoundFile for
+    description of other arguments.
     """
-    # pylint: disable=R0904
-    def __init__(self, name, raise_if=ErrorDefect, lazy=False):
-        super(CfbIO, self).__init__(name, mode='rb')
-        MaybeDefected.__init__(self, raise_if=raise_if)
-
+    # pylint: disable=R0904, R0913
+    def __init__(self, name, raise_if=ErrorDefect, lazy=False, stats=None,
+                 tracer=None, index_cache=None, max_read=None):
+        FileIO.__init__(self, name, mode='rb')
         self.size = fstat(self.fileno()).st_size
-        self.header = Header(self)
-
-        self.directory = Directory(self)
-        if not lazy:
-            self.directory.read()
 
-    def __del__(self):
-        self.close()
+        CompoundFile.__init__(self, raise_if=raise_if, lazy=lazy,
+                              stats=stats, tracer=tracer,
+                              index_cache=index_cache, max_read=max_read)
 
-    @cached
-    def root(self):
-        """ Property provides access to root object in CFB. """
-        sector = self.header.directory_sector_start
-        position = (sector + 1) << self.header.sector_shift
-        return RootEntry(self, position)
+    def close(self):
+        """ Closes file and exports its statistics, if they are enabled """
+        if not self.closed and self.stats is not None:
+            self.stats.export(self.name)
+        super(CfbIO, self).close()
 
-    def next_fat(self, current):
+    def read_at(self, position, size):
         """
-        Helper gives you seekable position of next FAT sector. Should not be
-        called from external code.
+        Reads `size` bytes from `position` without changing current
+        position. Uses positional read, so threads don't wait each other.
         """
-        sector_size = self.header.sector_size // 4
-        block = current // sector_size
-        difat_position = 76
-
-        if block >= 109:
-            block -= 109
-            sector = self.header.difat_sector_start
-
-            while block >= sector_size:
-                position = (sector + 1) << self.header.sector_shift
-                position += self.header.sector_size - 4
-                sector = self.get_long(position)
-                block -= sector_size - 1
-
-            difat_position = (sector + 1) << self.header.sector_shift
-        fat_sector = self.get_long(difat_position + block * 4)
-
-        fat_position = (fat_sector + 1) << self.header.sector_shift
-        fat_position += (current % sector_size) * 4
-
-        return self.get_long(fat_position)
-
-    def next_minifat(self, current):
-        """
-        Helpers provides access to next mini-FAT sector and returns it's
-        seekable position. Should not be called from external code.
-        """
-        position = 0
-        sector_size = self.header.sector_size // 4
-        sector = self.header.minifat_sector_start
-
-        while sector != ENDOFCHAIN and (position + 1) * sector_size <= current:
-            sector = self.next_fat(sector)
-            position += 1
-
-        if sector == ENDOFCHAIN:
-            return ENDOFCHAIN
-
-        minifat_position = (sector + 1) << self.header.sector_shift
-        minifat_position += (current - position * sector_size) * 4
-
-        return self.get_long(minifat_position)
-
-    def __getitem__(self, item):
-        """ You can access Directory Entries by ID (integer) or by name """
-        if isinstance(item, string_types):
-            return self.directory.by_name(item)
-        return self.directory[item]
-
-    def __len__(self):
-        return len(self.directory)
+        if pread is None:
+            return CompoundFile.read_at(self, position, size)
+
+        data = pread(self.fileno(), size, position)
+        if self.stats is not None:
+            self.stats.reads += 1
+            self.stats.bytes_read += len(data)
+        return data
 
     def __repr__(self):
         return '<%s "%s">' % (self.__class__.__name__, self.name)
@@ -0,0 +1,6 @@
+""" Allows running command line tool as "python -m cfb" """
+import sys
+
+from cfb.cli import main
+
+sys.exit(main())
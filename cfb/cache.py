@@ -0,0 +1,152 @@
+""" Persistent sidecar index of parsed files structures """
+from array import array
+from functools import partial
+from mmap import mmap, ACCESS_READ
+from os import fdopen, fstat, remove, rename
+from os.path import abspath, join
+from struct import Struct, error as UnpackError
+from sys import byteorder
+
+from cfb.helpers import LONGS
+
+__all__ = ['IndexCache']
+
+MAGIC = b'CFBIDX\x00\x01'
+HEADER = Struct('<8s4sQq20sLLLLL')
+PATH = Struct('<LH')
+
+
+def fingerprint(source):
+    """
+    Returns (size, modification time, header digest) triple identifying
+    current content of opened file without reading it whole.
+    """
+    from hashlib import sha1
+    status = fstat(source.fileno())
+    mtime = getattr(status, 'st_mtime_ns', None)
+    if mtime is None:
+        mtime = int(status.st_mtime * 10 ** 9)
+
+    source.seek(0)
+    return status.st_size, mtime, sha1(source.read(512)).digest()
+
+
+def decode_paths(view):
+    """ Decodes paths index stored in index file """
+    paths = {}
+    position = 0
+    while position < len(view):
+        entry_id, length = PATH.unpack(view[position:position + PATH.size])
+        position += PATH.size
+        paths[view[position:position + length].tobytes().decode('utf-8')] = \
+            entry_id
+        position += length
+    return paths
+
+
+class IndexCache(object):
+    """
+    On-disk cache of decoded DIFAT, FAT, mini-FAT, raw directory table and
+    paths index. Every opened file has own index file in cache `directory`
+    named by its absolute path and is valid while file size, modification
+    time and header stay the same. Tables are stored in native byte order
+    and memory-mapped on load, so cached file opens without parsing.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def filename(self, source):
+        """ Name of index file of opened `source` file """
+        from hashlib import sha1
+        name = abspath(source.name).encode('utf-8', 'surrogateescape')
+        return join(self.directory, sha1(name).hexdigest() + '.cfbi')
+
+    def load(self, source):
+        """
+        Returns dictionary with difat, fat, minifat, table and paths (as
+        function decoding them on demand) of opened `source` file or None if
+        there is no valid index.
+        """
+        try:
+            with open(self.filename(source), 'rb') as index:
+                mapped = mmap(index.fileno(), 0, access=ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        try:
+            result = self._decode(memoryview(mapped), fingerprint(source))
+        except (UnpackError, ValueError, TypeError, UnicodeDecodeError):
+            result = None
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    @staticmethod
+    def _decode(view, expected):
+        """ Decodes index file content if it matches `expected` file """
+        (magic, order, size, mtime, digest, difat, fat, minifat, table,
+         paths) = HEADER.unpack(view[:HEADER.size])
+        order = order.rstrip(b'\0')
+        if magic != MAGIC or order != byteorder[0].encode() or \
+                (size, mtime, digest) != expected:
+            return None
+
+        result = {}
+        position = HEADER.size
+        for name, count in (('difat', difat), ('fat', fat),
+                            ('minifat', minifat)):
+            end = position + count * 4
+            result[name] = view[position:end].cast(LONGS)
+            position = end
+        result['difat'] = result['difat'].tolist()
+
+        result['table'] = view[position:position + table]
+        position += table
+
+        if position + paths != len(view):
+            return None
+        result['paths'] = partial(decode_paths, view[position:])
+        return result
+
+    def save(self, source):
+        """
+        Writes index of opened `source` file. Index is written to temporary
+        file and then renamed, so concurrent readers never see partial one.
+        Returns False if index can't be written.
+        """
+        from tempfile import mkstemp
+        paths = b''.join(
+            PATH.pack(entry_id, len(name)) + name for name, entry_id in
+            ((path.encode('utf-8'), entry_id)
+             for path, entry_id in sorted(source.directory.paths.items())))
+        tables = [array(LONGS, source.difat), source.fat, source.minifat]
+        table = bytes(source.directory.table)
+
+        header = HEADER.pack(
+            MAGIC, byteorder[0].encode(), *(fingerprint(source) + tuple(
+                len(item) for item in tables) + (len(table), len(paths))))
+
+        try:
+            descriptor, temporary = mkstemp(suffix='.tmp',
+                                            dir=self.directory)
+        except (IOError, OSError):
+            return False
+
+        try:
+            with fdopen(descriptor, 'wb') as output:
+                output.write(header)
+                for item in tables:
+                    output.write(item.tobytes())
+                output.write(table)
+                output.write(paths)
+            rename(temporary, self.filename(source))
+        except (IOError, OSError):
+            remove(temporary)
+            return False
+        return True
@@ -0,0 +1,234 @@
+"""
+Command line tool: "cfb ls|cat|extract|stat|verify". Subcommands, which
+accept many files or directories, process them by pool of worker
+processes and write one JSON object per line.
+"""
+import sys
+from argparse import ArgumentParser
+from functools import partial
+from json import dumps
+from os import makedirs, walk
+from os.path import basename, isdir, join, realpath, sep
+from warnings import catch_warnings, simplefilter
+
+from cfb import CfbIO, probe
+from cfb.constants import STORAGE, STREAM
+from cfb.exceptions import CfbError
+
+__all__ = ['main']
+
+TYPES = {STORAGE: "storage", STREAM: "stream"}
+# Characters, which can't be part of file name on some of systems
+UNSAFE = frozenset('<>:"/\\|?*')
+
+
+def expand(names):
+    """
+    Generates files names: listed files as is, files from listed
+    directories (recursively) only if they look like compound files.
+    """
+    for name in names:
+        if not isdir(name):
+            yield name
+            continue
+        for directory, directories, files in walk(name):
+            directories.sort()
+            for filename in sorted(files):
+                filename = join(directory, filename)
+                try:
+                    if probe(filename) is not None:
+                        yield filename
+                except Exception:  # pylint: disable=W0703
+                    # Malformed file is skipped, it isn't compound file
+                    continue
+
+
+def safe_name(name):
+    """
+    Entry name usable as file name, control characters are escaped, as
+    well as whole "." and ".." names, which are legal in compound files.
+    """
+    if name in (".", ".."):
+        return "".join("_%02x" % ord(char) for char in name)
+    return "".join("_%02x" % ord(char)
+                   if not char.isprintable() or char in UNSAFE else char
+                   for char in name) or "_"
+
+
+def ls(options, filename):
+    """ Lists all entries of file """
+    # pylint: disable=C0103, W0613
+    with CfbIO(filename, lazy=True) as opened:
+        return [dict(file=filename, path=path, type=TYPES.get(entry.type),
+                     size=entry.size if entry.type == STREAM else None)
+                for path, entry in sorted(opened.directory.walk(),
+                                          key=lambda item: item[0])]
+
+
+def stat(options, filename):
+    """ Summary of file from header and directory """
+    # pylint: disable=W0613
+    summary = probe(filename)
+    if summary is None:
+        raise CfbError("Not a compound file")
+
+    with CfbIO(filename, lazy=True) as opened:
+        streams = [entry for _, entry in opened.streams()]
+        return [dict(file=filename, version="%d.%d" % summary.version,
+                     sector_size=summary.sector_size, size=summary.size,
+                     root_clsid=str(summary.root_clsid),
+                     entries=len(opened.directory.paths),
+                     streams=len(streams),
+                     bytes=sum(entry.size for entry in streams))]
+
+
+def extract(options, filename):
+    """ Writes streams of file into output directory """
+    result = []
+    target = join(options.output, safe_name(basename(filename)))
+    with CfbIO(filename) as opened:
+        for path, entry in opened.streams():
+            if options.paths and path not in options.paths:
+                continue
+            parts = [safe_name(part) for part in path.split("/")]
+            directory = join(target, *parts[:-1])
+            output = join(directory, parts[-1])
+            if not realpath(output).startswith(realpath(target) + sep):
+                raise CfbError("Stream %r would be written outside of %s." %
+                               (path, target))
+            if not isdir(directory):
+                makedirs(directory)
+
+            with open(output, "wb") as stream:
+                for data in entry.chunks(options.chunk_size):
+                    stream.write(data)
+            result.append(dict(file=filename, path=path, output=output,
+                               size=entry.size))
+    return result
+
+
+def verify(options, filename):
+    """
+    Reads all structures and streams of file. Warnings are collected, the
+    first error stops checking; file is fine if it has warnings only.
+    """
+    errors, streams = [], 0
+    with catch_warnings(record=True) as caught:
+        simplefilter("always")
+        try:
+            with CfbIO(filename) as opened:
+                for path, entry in opened.streams():
+                    length = sum(size for _, size in entry.extents)
+                    if length != entry.size:
+                        errors.append("Stream %r is %d bytes long, but its "
+                                      "sectors store %d." %
+                                      (path, entry.size, length))
+                    entry.digest(options.algorithm, options.chunk_size)
+                    streams += 1
+        except Exception as error:  # pylint: disable=W0703
+            errors.append(str(error) or repr(error))
+            streams = None
+
+    warnings = [str(item.message) for item in caught]
+    return [dict(file=filename, ok=not errors, streams=streams,
+                 errors=errors, warnings=warnings)]
+
+
+def guard(command, options, filename):
+    """
+    Runs `command` for single file. Any error (malformed files can raise
+    anything from ValueError to MemoryError) is reported as record, so it
+    doesn't stop processing of other files.
+    """
+    try:
+        return command(options, filename)
+    except Exception as error:  # pylint: disable=W0703
+        return [dict(file=filename, error=str(error) or repr(error))]
+
+
+def parser():
+    """ Builds arguments parser """
+    result = ArgumentParser(prog="cfb", description=__doc__.strip())
+    commands = result.add_subparsers(dest="command")
+    commands.required = True
+
+    def command(name, function, description, many=True):
+        """ Adds subcommand """
+        sub = commands.add_parser(name, help=description,
+                                  description=description)
+        sub.set_defaults(function=function)
+        if many:
+            sub.add_argument("files", nargs="+", metavar="FILE",
+                             help="compound files or directories")
+            sub.add_argument("-j", "--jobs", type=int, default=1,
+                             help="number of worker processes")
+        sub.add_argument("--chunk-size", type=int, default=2 ** 16,
+                         help="size of read blocks")
+        return sub
+
+    command("ls", ls, "list entries of files")
+    command("stat", stat, "show summary of files")
+    sub = command("extract", extract, "write streams into directory")
+    sub.add_argument("-o", "--output", default=".",
+                     help="output directory")
+    sub.add_argument("-p", "--path", dest="paths", action="append",
+                     help="extract only this stream (could be repeated)")
+    sub = command("verify", verify, "check files for defects")
+    sub.add_argument("--algorithm", default="sha256",
+                     help="hash algorithm streams are read with")
+    sub = command("cat", None, "write stream data to standard output",
+                  many=False)
+    sub.add_argument("file", metavar="FILE", help="compound file")
+    sub.add_argument("path", metavar="PATH", help="stream path")
+    return result
+
+
+def cat(options, output):
+    """ Writes data of single stream """
+    with CfbIO(options.file, lazy=True) as opened:
+        for data in opened.directory.by_path(options.path).chunks(
+                options.chunk_size):
+            output.write(data)
+    output.flush()
+
+
+def main(argv=None):
+    """ Entry point of console command, returns exit status """
+    options = parser().parse_args(argv)
+    simplefilter("ignore", SyntaxWarning)
+
+    if options.command == "cat":
+        try:
+            cat(options, getattr(sys.stdout, "buffer", sys.stdout))
+        except Exception as error:  # pylint: disable=W0703
+            sys.stderr.write("cfb: %s\n" % (str(error) or repr(error)))
+            return 1
+        return 0
+
+    files = list(expand(options.files))
+    work = partial(guard, options.function, options)
+
+    if options.jobs > 1 and len(files) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(options.jobs) as pool:
+            return write(pool.map(work, files, chunksize=16))
+    return write(map(work, files))
+
+
+def write(results):
+    """
+    Writes records of every file as soon as they are ready. Returns exit
+    status: 1 if any file failed or has errors.
+    """
+    status = 0
+    for records in results:
+        for record in records:
+            if "error" in record or record.get("ok") is False:
+                status = 1
+            sys.stdout.write(dumps(record, sort_keys=True) + "\n")
+        sys.stdout.flush()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
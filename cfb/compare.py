@@ -0,0 +1,94 @@
+""" Fast comparison of two compound files at stream and sector level """
+from collections import namedtuple
+
+from cfb.constants import STREAM
+from cfb.helpers import slice_extents
+
+__all__ = ['Change', 'diff', 'ADDED', 'REMOVED', 'TYPE', 'SIZE', 'TIMES',
+           'DATA']
+
+ADDED = "added"
+REMOVED = "removed"
+TYPE = "type"
+SIZE = "size"
+TIMES = "times"
+DATA = "data"
+
+
+class Change(namedtuple('Change', 'path kind offset')):
+    """
+    Single difference of entry found by `path`. Kind is one of "added",
+    "removed", "type", "size", "times" and "data", `offset` is position of
+    first different byte of stream data (for "data" kind only).
+    """
+    __slots__ = ()
+
+
+def first_difference(a, b, chunk_size=2 ** 16):
+    """
+    Returns offset of first different byte of same sized `a` and `b`
+    stream entries or None if their data are equal. Data are compared
+    block by block straight from their extents and comparison stops on
+    first different block, so only sectors before it are read.
+    """
+    if a.source is b.source and a.extents == b.extents:
+        return None
+
+    offset = 0
+    while offset < a.size:
+        length = min(chunk_size, a.size - offset)
+        left = b''.join(a.source.read_at(position, size) for position, size
+                        in slice_extents(a.extents, offset, length))
+        right = b''.join(b.source.read_at(position, size) for position, size
+                         in slice_extents(b.extents, offset, length))
+        if left != right:
+            for index, (x, y) in enumerate(zip(left, right)):
+                if x != y:
+                    return offset + index
+            return offset + min(len(left), len(right))
+        if not left:
+            break
+        offset += length
+    return None
+
+
+def diff(a, b, chunk_size=2 ** 16):
+    """
+    Compares opened compound files `a` and `b` and returns list of changes
+    sorted by path. Entries are matched by their paths. Types, sizes and
+    timestamps from directory tables are compared first, data of same
+    sized streams are read and compared only if metadata don't differ
+    enough to tell (stream with other size is always reported as resized,
+    without reading it).
+    """
+    # pylint: disable=C0103
+    left, right = a.directory.paths, b.directory.paths
+    changes = []
+
+    for path in sorted(set(left) | set(right)):
+        if path not in right:
+            changes.append(Change(path, REMOVED, None))
+            continue
+        if path not in left:
+            changes.append(Change(path, ADDED, None))
+            continue
+
+        old, new = a.directory[left[path]], b.directory[right[path]]
+        if old.type != new.type:
+            changes.append(Change(path, TYPE, None))
+            continue
+        if (old.creation_time, old.modified_time) != \
+                (new.creation_time, new.modified_time):
+            changes.append(Change(path, TIMES, None))
+        if old.type != STREAM:
+            continue
+
+        if old.size != new.size:
+            changes.append(Change(path, SIZE, None))
+            continue
+
+        offset = first_difference(old, new, chunk_size)
+        if offset is not None:
+            changes.append(Change(path, DATA, offset))
+
+    return changes
@@ -0,0 +1,297 @@
+""" Compound File Binary Format structure access shared by all sources """
+from array import array
+from threading import Lock
+
+from cfb.cache import IndexCache
+from cfb.constants import ENDOFCHAIN, MAXREGSECT, STREAM
+from cfb.directory import Directory
+from cfb.directory.entry import RootEntry
+from cfb.exceptions import MaybeDefected, ErrorDefect
+from cfb.header import Header
+from cfb.helpers import ByteHelpers, LONGS, cached, runs
+from cfb.recovery import scan
+from cfb.stats import Stats
+from cfb.tracing import Span, NULL_SPAN
+
+__all__ = ['CompoundFile']
+
+
+class CompoundFile(MaybeDefected, ByteHelpers):
+    """
+    Mixin adds access to internal structure of Compound File Binary Format
+    to any seekable and readable object with `name` and `size` attributes.
+    Pass `stats` (Stats instance or True) to count IO operations done while
+    reading and `tracer` (see cfb.tracing) to receive spans of processing
+    phases. If `index_cache` (directory name or IndexCache instance) is
+    set, decoded allocation tables and directory are stored there, so next
+    opening of unchanged file doesn't parse them again. `max_read` is memory
+    budget of single entry read in bytes (unlimited by default).
+    """
+    # pylint: disable=R0904, R0913
+    stats = None
+    tracers = ()
+    max_read = None
+
+    def __init__(self, raise_if=ErrorDefect, lazy=False, stats=None,
+                 tracer=None, index_cache=None, max_read=None):
+        MaybeDefected.__init__(self, raise_if=raise_if)
+        self.lock = Lock()
+        self.max_read = max_read
+
+        if stats is not None and stats is not False:
+            self.stats = Stats() if stats is True else stats
+            self.stats.attach(self)
+            self.tracers += (self.stats,)
+        if tracer is not None:
+            self.tracers += (tracer,)
+
+        with self.phase("header"):
+            self.header = Header(self)
+
+        index = None
+        if index_cache is not None:
+            if isinstance(index_cache, str):
+                index_cache = IndexCache(index_cache)
+            with self.phase("index"):
+                index = index_cache.load(self)
+
+        if index is None:
+            self.directory = Directory(self)
+            if not lazy:
+                self.directory.read()
+            if index_cache is not None:
+                with self.phase("index"):
+                    index_cache.save(self)
+        else:
+            self.difat = index["difat"]
+            self.fat = index["fat"]
+            self.minifat = index["minifat"]
+            self.directory = Directory(self, index["table"], index["paths"])
+
+    def phase(self, name, entry_id=None, offset=None, size=None):
+        """
+        Returns span (context manager) of named processing phase, which
+        notifies statistics and tracer. Without them it does nothing.
+        """
+        if not self.tracers:
+            return NULL_SPAN
+        return Span(self.tracers, name, self.name, entry_id, offset, size)
+
+    @cached
+    def root(self):
+        """ Property provides access to root object in CFB. """
+        sector = self.header.directory_sector_start
+        position = (sector + 1) << self.header.sector_shift
+        if self.stats is not None:
+            self.stats.entries_parsed += 1
+        return RootEntry(self, position)
+
+    def read_at(self, position, size):
+        """
+        Reads `size` bytes from `position` without changing current
+        position. Could be called from many threads at once.
+        """
+        with self.lock:
+            current = self.tell()
+            self.seek(position)
+            data = self.read(size)
+            self.seek(current)
+        return data
+
+    def read_sectors(self, sectors, shift=None):
+        """
+        Reads and joins data of listed sectors. Runs of consecutive sectors
+        are read at once.
+        """
+        shift = self.header.sector_shift if shift is None else shift
+        data = []
+        for first, count in runs(sectors):
+            self.seek((first + 1) << shift)
+            data.append(self.read(count << shift))
+        return b''.join(data)
+
+    def load_longs(self, sectors):
+        """
+        Decodes allocation table (FAT, mini-FAT) stored in listed sectors
+        into array of longs.
+        """
+        per_sector = self.header.sector_size // 4
+        table = array(LONGS)
+        for first, count in runs(sectors):
+            position = (first + 1) << self.header.sector_shift
+            table.extend(self.get_longs(position, count * per_sector))
+        return table
+
+    @cached
+    def difat(self):
+        """
+        List of FAT sectors, first 109 of them are stored in header, others
+        in chain of DIFAT sectors.
+        """
+        header = self.header
+        per_sector = header.sector_size // 4
+        # DIFAT chain can't be longer than header declares and file holds
+        limit = min(header.difat_sector_count,
+                    -(-self.size >> header.sector_shift))
+
+        with self.phase("fat"):
+            sectors = list(self.get_longs(76, 109))
+            sector, seen = header.difat_sector_start, set()
+            while sector <= MAXREGSECT and \
+                    len(sectors) < header.fat_sectors_count:
+                if sector in seen:
+                    self._error("DIFAT sectors chain is cyclic.")
+                    break
+                if len(seen) >= limit:
+                    self._error("DIFAT sectors chain is longer than %d "
+                                "sectors." % limit)
+                    break
+                seen.add(sector)
+                position = (sector + 1) << header.sector_shift
+                block = self.get_longs(position, per_sector)
+                if not block:
+                    break
+                sectors.extend(block[:-1])
+                sector = block[-1]
+
+        return [sector for sector in sectors[:header.fat_sectors_count]
+                if sector <= MAXREGSECT]
+
+    @cached
+    def fat(self):
+        """ Whole FAT decoded into array of next sectors numbers """
+        with self.phase("fat"):
+            return self.load_longs(self.difat)
+
+    @cached
+    def minifat(self):
+        """ Whole mini-FAT decoded into array of next mini sectors numbers """
+        with self.phase("fat"):
+            return self.load_longs(
+                self.chain(self.header.minifat_sector_start))
+
+    def next_fat(self, current):
+        """
+        Helper gives you number of next sector in FAT chain. Should not be
+        called from external code.
+        """
+        if self.stats is not None:
+            self.stats.fat_hops += 1
+        try:
+            return self.fat[current]
+        except IndexError:
+            self._error("Sector %d is out of FAT." % current)
+            return ENDOFCHAIN
+
+    def next_minifat(self, current):
+        """
+        Helpers gives you number of next mini sector in mini-FAT chain.
+        Should not be called from external code.
+        """
+        if self.stats is not None:
+            self.stats.minifat_hops += 1
+        try:
+            return self.minifat[current]
+        except IndexError:
+            return ENDOFCHAIN
+
+    def chain(self, start, mini=False):
+        """
+        Returns list of sectors (or mini sectors) chained in FAT (or
+        mini-FAT) starting from `start` sector. Chain is cut on first
+        repeated sector and when it's longer than file could hold.
+        """
+        if mini:
+            table, shift = self.minifat, self.header.mini_sector_shift
+            next_sector = self.next_minifat
+        else:
+            table, shift = self.fat, self.header.sector_shift
+            next_sector = self.next_fat
+        limit = min(len(table), -(-self.size >> shift))
+
+        with self.phase("chain", offset=start):
+            sectors, seen = [], set()
+            while start <= MAXREGSECT:
+                if start in seen:
+                    self._error("Sector chain is cyclic.")
+                    break
+                if len(sectors) >= limit:
+                    self._error("Sector chain is longer than file.")
+                    break
+                seen.add(start)
+                sectors.append(start)
+                start = next_sector(start)
+
+        return sectors
+
+    def streams(self):
+        """ Generates (path, entry) pairs of all streams sorted by path """
+        for path, entry_id in sorted(self.directory.paths.items()):
+            entry = self.directory[entry_id]
+            if entry.type == STREAM:
+                yield path, entry
+
+    def digests(self, algorithm="sha256", workers=None, paths=None):
+        """
+        Returns dictionary of streams paths and hex digests of their data.
+        Streams are hashed block by block straight from their extents, by
+        pool of `workers` threads, if it's set (hashlib and positional reads
+        release GIL). Only streams from `paths` are hashed, if it's set.
+        """
+        if paths is None:
+            paths = [path for path, _ in self.streams()]
+        entries = [self.directory.by_path(path) for path in paths]
+        # Extents are computed here, not concurrently by workers
+        for entry in entries:
+            len(entry.extents)
+
+        def digest(entry):
+            """ Digest of single entry """
+            return entry.digest(algorithm)
+
+        if workers and workers > 1 and len(entries) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(workers) as pool:
+                values = list(pool.map(digest, entries))
+        else:
+            values = [digest(entry) for entry in entries]
+
+        return dict(zip(paths, values))
+
+    def scan_unallocated(self):
+        """
+        Generates findings (see cfb.recovery.Finding) of data directory
+        doesn't reference: deleted entries, slack space after streams data,
+        orphan sectors chains and free sectors, with their byte ranges.
+        Whole scan is one pass over in-memory allocation tables and raw
+        directory table; data themselves aren't read.
+        """
+        return scan(self)
+
+    def open_nested(self, entry, offset=0, **options):
+        """
+        Opens compound file embedded in data of `entry` (path or Entry of
+        this file) from `offset` byte without copying it, see NestedCfb.
+        Options are passed to NestedCfb, missing ones are same as ours.
+        """
+        from cfb.nested import NestedCfb
+        if isinstance(entry, str):
+            entry = self.directory.by_path(entry)
+        options.setdefault('raise_if', self.minimum_defect)
+        options.setdefault('max_read', self.max_read)
+        return NestedCfb(entry, offset, **options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __getitem__(self, item):
+        """ You can access Directory Entries by ID (integer) or by name """
+        if isinstance(item, str):
+            return self.directory.by_name(item)
+        return self.directory[item]
+
+    def __len__(self):
+        return len(self.directory)
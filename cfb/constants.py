@@ -1,13 +1,21 @@
 """ Internal CFB constants """
-from cfb.helpers import Guid
-
 MAXREGSID = 0xfffffffa
+MAXREGSECT = 0xfffffffa
+DIFSECT = 0xfffffffc
+FATSECT = 0xfffffffd
 ENDOFCHAIN = 0xfffffffe
 NOSTREAM = 0xffffffff
+FREESECT = 0xffffffff
 
 UNALLOCATED = 0x00
 STORAGE = 0x01
 STREAM = 0x02
 ROOT = 0x05
 
-GUID_NULL = Guid('\0' * 16)
+
+def __getattr__(name):
+    """ GUID_NULL is built on first access, so uuid isn't imported early """
+    if name == 'GUID_NULL':
+        from cfb.guid import Guid
+        return Guid(b'\0' * 16)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
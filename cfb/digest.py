@@ -0,0 +1,68 @@
+""" Streams content hashing and deduplication across many files """
+from os.path import abspath
+
+from cfb.cache import fingerprint
+
+__all__ = ['CorpusHasher', 'hash_extents']
+
+
+def hash_extents(source, extents, algorithm="sha256", chunk_size=2 ** 16):
+    """
+    Hashes data stored in (position, length) `extents` of `source` by
+    blocks of `chunk_size` bytes. Returns hex digest.
+    """
+    from hashlib import new
+    result = new(algorithm)
+    for position, length in extents:
+        while length > 0:
+            data = source.read_at(position, min(length, chunk_size))
+            if not data:
+                break
+            result.update(data)
+            position += len(data)
+            length -= len(data)
+    return result.hexdigest()
+
+
+class CorpusHasher(object):
+    """
+    Hashes streams of many files and remembers results. Stream isn't hashed
+    again while file (path, size, modification time and header), stream
+    size and its extents stay the same. `known` dictionary could be stored
+    between runs (e.g. by pickle) and passed back.
+    """
+    def __init__(self, algorithm="sha256", workers=None, known=None):
+        self.algorithm = algorithm
+        self.workers = workers
+        self.known = {} if known is None else known
+        self.hashed = 0
+        self.skipped = 0
+
+    def digests(self, source):
+        """
+        Returns dictionary of paths of all streams in opened `source` and
+        their digests.
+        """
+        try:
+            identity = (abspath(source.name), fingerprint(source))
+        except (AttributeError, TypeError, ValueError, OSError):
+            identity = None
+
+        result, missing = {}, []
+        for path, entry in source.streams():
+            key = (identity, entry.size, tuple(entry.extents))
+            if identity is not None and key in self.known:
+                result[path] = self.known[key]
+                self.skipped += 1
+            else:
+                missing.append((path, entry, key))
+
+        paths = [path for path, _, _ in missing]
+        computed = source.digests(self.algorithm, self.workers, paths)
+        for path, _, key in missing:
+            result[path] = computed[path]
+            if identity is not None:
+                self.known[key] = computed[path]
+        self.hashed += len(missing)
+
+        return result
@@ -1,41 +1,112 @@
 """ Internal directory structure """
-from six import integer_types
+from weakref import ref
 
-from cfb.constants import ENDOFCHAIN
+from cfb.constants import NOSTREAM
 from cfb.directory.entry import Entry
 from cfb.exceptions import CfbDefect
+from cfb.helpers import cached
 
 __all__ = ['Directory']
 
 
 class Directory(dict):
     """
-    Provides dictionary access to internal directory structure.
+    Provides dictionary access to internal directory structure. Raw
+    directory `table` and `paths` index (or function returning it) could be
+    passed, if they are already known (e.g. from index cache). Like
+    entries, directory refers to its file weakly.
     """
-    def __init__(self, source):
+    def __init__(self, source, table=None, paths=None):
         super(Directory, self).__init__()
         self._name_cache = {}
-
-        self.source = source
-        self[0] = self.source.root
-
-    def __del__(self):
-        del self.source
+        self._table = table
+        self._paths = paths
+
+        self._source = ref(source)
+        self[0] = source.root
+
+    @property
+    def source(self):
+        """ File of directory, ValueError is raised if it's freed """
+        source = self._source()
+        if source is None:
+            raise ValueError("I/O operation on closed file.")
+        return source
+
+    @cached
+    def sectors(self):
+        """ Chain of sectors storing directory entries """
+        return self.source.chain(self.source.header.directory_sector_start)
+
+    @property
+    def table(self):
+        """
+        Raw directory entries records. Whole table is read at once on
+        first access, following entries are parsed from memory.
+        """
+        if self._table is None:
+            self._table = self.source.read_sectors(self.sectors)
+        return self._table
 
     def read(self):
         """
         This module is lazy-loaded by default. You can read all internal
-        structure by calling this method.
+        structure (including storages content) by calling this method.
         """
-        stack = [self[0].child]
-        while stack:
-            current = stack.pop()
-            if current.right:
-                stack.append(current.right)
-            if current.left:
-                stack.append(current.left)
+        with self.source.phase("directory"):
+            if self._table is None:
+                self._table = self.table
+            self.paths = self._walk()
+
+            self[0].seek(0)
+
+    @cached
+    def paths(self):
+        """
+        Dictionary of full paths ("Storage/Stream") of all entries
+        reachable from root and their IDs.
+        """
+        if callable(self._paths):
+            return self._paths()
+        if self._paths is not None:
+            return self._paths
+        return self._walk()
+
+    def _walk(self):
+        """ Parses all entries reachable from root, returns their paths """
+        return dict((path, entry.id) for path, entry in self.walk())
 
-        self[0].seek(0)
+    def walk(self):
+        """
+        Generates (path, entry) pairs of all entries reachable from root,
+        parsing every entry only when it's needed.
+        """
+        seen = set([0])
+        stack = [(self[0].child_id, "")]
+        while stack:
+            entry_id, prefix = stack.pop()
+            if entry_id == NOSTREAM or entry_id in seen:
+                continue
+            seen.add(entry_id)
+            try:
+                entry = self[entry_id]
+            except KeyError:
+                continue
+
+            yield prefix + entry.name, entry
+            stack.append((entry.right_sibling_id, prefix))
+            stack.append((entry.left_sibling_id, prefix))
+            stack.append((entry.child_id, prefix + entry.name + "/"))
+
+    def by_path(self, path):
+        """
+        Access to directory entry by its full path, where storages names are
+        separated by slash: "ObjectPool/_1234/\x01Ole". Raises KeyError if
+        there is no such entry.
+        """
+        if path == self[0].name:
+            return self[0]
+        return self[self.paths[path]]
 
     def __getitem__(self, entry_id):
         """
@@ -44,31 +115,39 @@ class Directory(dict):
         not loaded yet entry, directory will seek for it in file and store
         it in own dictionary. Next time it uses "cached" way.
         """
-        if not isinstance(entry_id, integer_types):
+        if not isinstance(entry_id, int):
             raise TypeError("EntryId should be integer, use by_name() method "
                             "to access Directory Entries by name.")
 
         if entry_id in self:
+            if self.source.stats is not None:
+                self.source.stats.cache_hits += 1
             return super(Directory, self).__getitem__(entry_id)
 
         sector_size = self.source.header.sector_size // 128
-        sector = self.source.header.directory_sector_start
-
-        current = 0
-        while (current + 1) * sector_size <= entry_id and sector != ENDOFCHAIN:
-            sector = self.source.next_fat(sector)
-            current += 1
+        sector = entry_id // sector_size
+        if entry_id < 0 or sector >= len(self.sectors):
+            raise KeyError(entry_id)
 
-        position = (sector + 1) << self.source.header.sector_shift
-        position += (entry_id - current * sector_size) * 128
+        position = \
+            (self.sectors[sector] + 1) << self.source.header.sector_shift
+        position += (entry_id % sector_size) * 128
 
         if position >= self.source.size:
             raise KeyError(entry_id)
 
-        try:
-            instance = Entry(entry_id, self.source, position)
-        except CfbDefect:
-            raise KeyError(entry_id)
+        record = None
+        if self._table is not None:
+            record = self._table[entry_id * 128:(entry_id + 1) * 128]
+
+        with self.source.phase("entry", entry_id, position, 128):
+            try:
+                instance = Entry(entry_id, self.source, position, record)
+            except CfbDefect:
+                raise KeyError(entry_id)
+
+        if self.source.stats is not None:
+            self.source.stats.entries_parsed += 1
 
         self[entry_id] = instance
         self._name_cache[instance.name] = entry_id
@@ -1,43 +1,58 @@
 """ Directory Entry structures """
+from bisect import bisect_right
 from os import SEEK_SET, SEEK_CUR, SEEK_END
-from re import search, UNICODE
-from struct import unpack, error as UnpackError
-from six import b
+from struct import Struct, error as UnpackError
+from weakref import ref
 
 from cfb.constants import UNALLOCATED, STORAGE, STREAM, ROOT, MAXREGSID, \
     NOSTREAM, ENDOFCHAIN
-from cfb.exceptions import MaybeDefected
-from cfb.helpers import ByteHelpers, Guid, from_filetime, cached
+from cfb.exceptions import MaybeDefected, ReadLimitError
+from cfb.digest import hash_extents
+from cfb.helpers import ByteHelpers, from_filetime, cached, runs, \
+    slice_extents, merge_ranges, map_ranges
 
 __all__ = ['Entry', 'RootEntry', 'SEEK_CUR', 'SEEK_END', 'SEEK_SET']
 
+RECORD = Struct('<64sHBBLLL16sLQQLQ')
+ILLEGAL = frozenset('/\\:!')
+
+
+def detached():
+    """ Stands for weak reference to file of closed entry """
+    return None
+
 
 class Entry(MaybeDefected, ByteHelpers):
     """
     General Entry class object. This is file-like object to access stored
-    data in any Directory Entry in CFB file.
+    data in any Directory Entry in CFB file. Entry refers to its file weakly,
+    so it doesn't keep file opened; close() (or leaving `with` block) only
+    detaches entry from file.
     """
     # pylint: disable=R0902
-    def __init__(self, entry_id, source, position):
+    def __init__(self, entry_id, source, position, record=None):
         super(Entry, self).__init__(source.minimum_defect)
 
         # pylint: disable=C0103
         self.id = entry_id
-        self.source = source
+        self._source = ref(source)
 
-        self.source.seek(position)
+        if record is None:
+            source.seek(position)
+            record = source.read(128)
         try:
             (name, name_length, self.type, self.color, self.left_sibling_id,
-             self.right_sibling_id, self.child_id, clsid, self.state_bits,
-             creation_time, modified_time, self.sector_start, self.size) \
-                = unpack('<64sHBBLLL16sLQQLQ', self.source.read(128))
+             self.right_sibling_id, self.child_id, self._clsid,
+             self.state_bits, self._creation_time, self._modified_time,
+             self.sector_start, self.size) \
+                = RECORD.unpack(record)
 
             try:
                 self.name = name[:name_length].decode("utf-16").rstrip("\0")
             except UnicodeDecodeError:
                 self._error("Bad Directory Entry name, maybe truncated.")
 
-            if search(r'[/\\:!]', self.name, UNICODE):
+            if not ILLEGAL.isdisjoint(self.name):
                 self._warning("The following characters are illegal and MUST "
                               "NOT be part of the name: '/', '\', ':', '!'.")
 
@@ -69,40 +84,77 @@ class Entry(MaybeDefected, ByteHelpers):
                               "field MUST be set to NOSTREAM (0xFFFFFFFF).")
                 self.child_id = NOSTREAM
 
-            self.clsid = Guid(clsid)
-
-            self.creation_time = from_filetime(creation_time) \
-                if creation_time else None
-            self.modified_time = from_filetime(modified_time) \
-                if modified_time else None
-
-            if self.source.header.version[0] == 3 and self.size > 0x80000000:
+            if source.header.version[0] == 3 and self.size > 0x80000000:
                 self._error("For a version 3 compound file 512-byte sector "
                             "size, this value of this field MUST be less than "
                             "or equal to 0x80000000.")
 
             self._is_mini = self.type != ROOT \
-                and self.size < self.source.header.cutoff_size
+                and self.size < source.header.cutoff_size
 
             self._position = 0
             self._position_in_sector = 0
-            self._source_position = self.source.tell()
+            self._source_position = source.tell()
 
             self._sector_number = self.sector_start
 
-            self.next_sector = self.source.next_minifat if self._is_mini \
-                else self.source.next_fat
-
             self.seek(0)
         except UnpackError:
             self._fatal("Bad Directory Entry header")
 
-    def __del__(self):
-        del self.source
-
     def __repr__(self):
         return '<%s[%d] "%s" of %r>' % (
-            self.__class__.__name__, self.id, self.name, self.source)
+            self.__class__.__name__, self.id, self.name, self._source())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @property
+    def source(self):
+        """ File of entry, ValueError is raised if it's closed or freed """
+        source = self._source()
+        if source is None:
+            raise ValueError("I/O operation on closed entry.")
+        return source
+
+    @property
+    def closed(self):
+        """ True if entry was closed or its file was freed """
+        return self._source() is None
+
+    def close(self):
+        """
+        Detaches entry from its file, file itself stays opened. Entry can't
+        read data anymore.
+        """
+        self._source = detached
+
+    @property
+    def next_sector(self):
+        """ Helper gives number of next sector (or mini sector) of entry """
+        return self.source.next_minifat if self._is_mini \
+            else self.source.next_fat
+
+    @cached
+    def clsid(self):
+        """ Class ID of storage object, decoded on first access """
+        from cfb.guid import Guid
+        return Guid(self._clsid)
+
+    @cached
+    def creation_time(self):
+        """ Creation time of storage object (None, if it's not set) """
+        return from_filetime(self._creation_time) \
+            if self._creation_time else None
+
+    @cached
+    def modified_time(self):
+        """ Modification time of storage object (None, if it's not set) """
+        return from_filetime(self._modified_time) \
+            if self._modified_time else None
 
     @cached
     def sector_size(self):
@@ -139,7 +191,7 @@ class Entry(MaybeDefected, ByteHelpers):
         return self.source.directory[self.right_sibling_id] \
             if self.right_sibling_id != NOSTREAM else None
 
-    @cached
+    @property
     def stream(self):
         """
         From what stream must current entry read data. Entries, which are
@@ -148,29 +200,188 @@ class Entry(MaybeDefected, ByteHelpers):
         """
         return self.source.root if self._is_mini else self.source
 
+    @cached
+    def sectors(self):
+        """
+        Chain of sectors (or mini sectors for data stored in mini stream)
+        of current entry.
+        """
+        if not self.size:
+            return []
+        return self.source.chain(self.sector_start, self._is_mini)
+
+    @cached
+    def stored_size(self):
+        """
+        Size of entry's data, which its sectors chain really holds. Declared
+        size is bigger for broken (or hostile) files, e.g. with cyclic or
+        truncated chains.
+        """
+        stored = len(self.sectors) << self.sector_shift
+        if stored >= self.size:
+            return self.size
+        self._warning("Entry size is %d bytes, but its sectors chain holds "
+                      "%d bytes only." % (self.size, stored))
+        return stored
+
+    @cached
+    def extents(self):
+        """
+        List of (position, length) runs of consecutive bytes in CFB file,
+        which store entry's data. Runs of consecutive sectors are joined,
+        mini sectors are mapped through Root Entry's extents.
+        """
+        result = []
+        for first, count in runs(self.sectors):
+            if self._is_mini:
+                parts = slice_extents(self.source.root.extents,
+                                      first << self.sector_shift,
+                                      count << self.sector_shift)
+            else:
+                parts = [((first + 1) << self.sector_shift,
+                          count << self.sector_shift)]
+
+            for position, length in parts:
+                if result and sum(result[-1]) == position:
+                    result[-1] = (result[-1][0], result[-1][1] + length)
+                else:
+                    result.append((position, length))
+
+        return slice_extents(result, 0, self.size)
+
+    def chunks(self, chunk_size=2 ** 16, offset=0):
+        """
+        Generates entry's data from `offset` by blocks of `chunk_size` bytes
+        at most, read directly from its extents. Current position is not
+        changed. Blocks aren't bigger than `max_read` budget of file.
+        """
+        if self.source.max_read is not None:
+            chunk_size = min(chunk_size, self.source.max_read)
+        for position, length in slice_extents(self.extents, offset,
+                                              self.size - offset):
+            while length > 0:
+                data = self.source.read_at(position, min(length, chunk_size))
+                if not data:
+                    return
+                yield data
+                position += len(data)
+                length -= len(data)
+
+    def read_ranges(self, ranges, buffers=None):
+        """
+        Reads many (offset, length) `ranges` of entry's data at once. Ranges
+        are sorted and merged, mapped to file extents in one pass over them
+        and every run of consecutive bytes in file is read by single call.
+        Returns list of data in order of `ranges` (shorter, if range crosses
+        entry's end). If writable `buffers` are passed (one per range), data
+        are copied into them and list of copied bytes counts is returned.
+        Current position is not changed.
+        """
+        ranges = list(ranges)
+        if buffers is not None and len(buffers) != len(ranges):
+            raise ValueError("One buffer per range is expected.")
+        for offset, length in ranges:
+            if offset < 0 or length < 0:
+                raise ValueError("Negative range (%d, %d)." % (offset, length))
+
+        spans = merge_ranges((offset, min(length, self.size - offset))
+                             for offset, length in ranges)
+        self.check_budget(sum(end - start for start, end in spans))
+        reads = []
+        for index, position, length in map_ranges(self.extents, spans):
+            if reads and sum(reads[-1][:2]) == position:
+                # Neighbour spans are neighbours in file too
+                reads[-1][1] += length
+                reads[-1][2].append((index, length))
+            else:
+                reads.append([position, length, [(index, length)]])
+
+        data = [bytearray() for _ in spans]
+        for position, length, parts in reads:
+            chunk = memoryview(self.source.read_at(position, length))
+            for index, size in parts:
+                data[index] += chunk[:size]
+                chunk = chunk[size:]
+
+        result = []
+        for number, (offset, length) in enumerate(ranges):
+            span = bisect_right(spans, [offset, float('inf')]) - 1
+            view = memoryview(data[span])[offset - spans[span][0]:][:length] \
+                if span >= 0 else memoryview(b'')
+            if buffers is None:
+                result.append(bytes(view))
+            else:
+                buffers[number][:len(view)] = view
+                result.append(len(view))
+        return result
+
+    def digest(self, algorithm="sha256", chunk_size=2 ** 16):
+        """
+        Returns hex digest of entry's data hashed by `algorithm` (any of
+        hashlib) block by block, never holding whole data in memory.
+        """
+        return hash_extents(self.source, self.extents, algorithm, chunk_size)
+
+    def properties(self):
+        """
+        Parses entry's data as property set stream (e.g. entry is
+        "\\x05SummaryInformation"), see cfb.properties.PropertySetStream.
+        """
+        from cfb.properties import PropertySetStream
+        return PropertySetStream(self)
+
+    def check_budget(self, size):
+        """
+        Raises ReadLimitError, if `size` bytes don't fit `max_read` budget
+        of file. Readers, which need whole stream in memory, call it first.
+        """
+        max_read = self.source.max_read
+        if max_read is not None and size > max_read:
+            raise ReadLimitError("Read of %d bytes is over budget of %d "
+                                 "bytes, read data by chunks()." %
+                                 (size, max_read))
+
     def read(self, size=None):
         """
         Reads `size` bytes from current directory entry. If `size` is empty,
-        it'll read all data till entry's end.
+        it'll read all data till entry's end. Long reads are limited by data
+        really stored in sectors chain, not by declared size only. Reads
+        bigger than `max_read` budget of file raise ReadLimitError, such
+        data should be read by chunks().
         """
+        source = self.source
+        if source.stats is not None:
+            source.stats.entry_reads += 1
+
+        wanted = max(self.size - self.tell(), 0)
+        if size is not None and 0 < size < wanted:
+            wanted = size
+        if wanted > self.sector_size:
+            wanted = min(wanted, max(self.stored_size - self.tell(), 0))
+        self.check_budget(wanted)
+
+        with source.phase("read", self.id, self.tell(), wanted):
+            return self._read(wanted) if wanted else b''
+
+    def _read(self, size):
+        """ Reads `size` bytes from stream sectors, used by read() """
         if self._is_mini:
             self.seek(self._position)
         else:
             self.source.seek(self._source_position)
-        if not size or size < 0:
-            size = self.size - self.tell()
 
-        data = b('')
-        while len(data) < size:
+        parts, done = [], 0
+        while done < size:
             if self.tell() > self.size:
                 break
             if self._sector_number == ENDOFCHAIN:
                 break
 
-            to_read = size - len(data)
+            to_read = size - done
             to_end = self.sector_size - self._position_in_sector
             to_do = min(to_read, to_end)
-            data += self.stream.read(to_do)
+            parts.append(self.stream.read(to_do))
+            done += len(parts[-1])
 
             self._position += to_do
             self._source_position = self.source.tell()
@@ -185,7 +396,7 @@ class Entry(MaybeDefected, ByteHelpers):
             else:
                 self._position_in_sector += to_do
 
-        return data
+        return b''.join(parts)
 
     def seek(self, offset, whence=SEEK_SET):
         """
@@ -204,7 +415,7 @@ class Entry(MaybeDefected, ByteHelpers):
         current = 0
 
         while self._sector_number != ENDOFCHAIN and \
-                (current + 1) * self.sector_size < offset:
+                (current + 1) * self.sector_size <= offset:
             self._sector_number = self.next_sector(self._sector_number)
             current += 1
 
@@ -239,4 +450,4 @@ class RootEntry(Entry):
             if self.child_id != NOSTREAM else None
 
     def __repr__(self):
-        return '<%s of %r>' % (self.__class__.__name__, self.source)
+        return '<%s of %r>' % (self.__class__.__name__, self._source())
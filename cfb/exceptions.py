@@ -6,6 +6,13 @@ class CfbError(Exception):
     """ Any CFB module must produce subexception of this class """
 
 
+class ReadLimitError(CfbError):
+    """
+    Single read is bigger than memory budget (`max_read`) of opened file.
+    Such data should be read by chunks.
+    """
+
+
 class CfbDefect(CfbError):
     """
     Defect is a special error type. Many CFB files may have some shit in
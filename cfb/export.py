@@ -0,0 +1,164 @@
+"""
+Columnar export of directory metadata of many files. Columns are built
+straight from raw 128-byte directory records, no Entry objects are created
+and times are kept as raw FILETIME integers or converted vectorised. NumPy
+and pyarrow are optional, plain lists are used without them.
+"""
+from itertools import islice
+
+from cfb.constants import UNALLOCATED
+from cfb.directory.entry import RECORD
+
+__all__ = ['COLUMNS', 'columns', 'to_numpy', 'arrow_batches',
+           'filetime_to_datetime64']
+
+COLUMNS = ('file', 'id', 'name', 'type', 'color', 'left_sibling_id',
+           'right_sibling_id', 'child_id', 'clsid', 'state_bits',
+           'creation_time', 'modified_time', 'sector_start', 'size')
+# FILETIME (100 ns intervals since 1601) of Unix epoch
+EPOCH = 116444736000000000
+
+
+def tables(sources):
+    """
+    Generates raw directory tables of `sources` (file names or opened
+    compound files), only whole 128-byte records. Files are opened lazily,
+    so only header, FAT and directory sectors are read.
+    """
+    for source in sources:
+        if isinstance(source, str):
+            from cfb import CfbIO
+            with CfbIO(source, lazy=True) as opened:
+                table = opened.directory.table
+        else:
+            table = source.directory.table
+        yield table[:len(table) - len(table) % RECORD.size]
+
+
+def columns(sources):
+    """
+    Pure Python export: dictionary of COLUMNS lists, one row per allocated
+    directory record. `file` is index of file in `sources`, `clsid` is raw
+    16 bytes, times are raw FILETIME integers (0 if not set).
+    """
+    result = dict((column, []) for column in COLUMNS)
+    appenders = [result[column].append for column in COLUMNS]
+    for index, table in enumerate(tables(sources)):
+        for entry_id, fields in enumerate(RECORD.iter_unpack(table)):
+            if fields[2] == UNALLOCATED:
+                continue
+            name = fields[0][:max(fields[1] - 2, 0)].decode(
+                'utf-16-le', 'replace')
+            for append, value in zip(appenders,
+                                     (index, entry_id, name) + fields[2:]):
+                append(value)
+    return result
+
+
+def record_dtype(numpy):
+    """ NumPy dtype matching raw directory record layout """
+    return numpy.dtype([
+        ('name', 'V64'), ('name_length', '<u2'), ('type', 'u1'),
+        ('color', 'u1'), ('left_sibling_id', '<u4'),
+        ('right_sibling_id', '<u4'), ('child_id', '<u4'), ('clsid', 'V16'),
+        ('state_bits', '<u4'), ('creation_time', '<u8'),
+        ('modified_time', '<u8'), ('sector_start', '<u4'), ('size', '<u8')])
+
+
+def filetime_to_datetime64(values):
+    """
+    Converts NumPy array of FILETIME integers to datetime64[us] array at
+    once, zeros (time is not set) become NaT.
+    """
+    import numpy
+    values = numpy.asarray(values, dtype='<u8')
+    result = ((values.astype('<i8') - EPOCH) // 10).astype('datetime64[us]')
+    result[values == 0] = numpy.datetime64('NaT')
+    return result
+
+
+def to_numpy(sources, convert_times=True):
+    """
+    Exports directories of all `sources` into single NumPy structured array
+    with COLUMNS fields. Raw tables of all files are joined first, so names
+    are decoded and times converted (if `convert_times` is set) by few
+    vectorised operations for whole batch. Names are decoded from UTF-16
+    code units, so characters outside BMP aren't joined from surrogates.
+    """
+    import numpy
+    raw_dtype = record_dtype(numpy)
+
+    records, files, ids = [], [], []
+    for index, table in enumerate(tables(sources)):
+        raw = numpy.frombuffer(table, raw_dtype)
+        allocated = numpy.flatnonzero(raw['type'] != UNALLOCATED)
+        records.append(raw[allocated])
+        files.append(numpy.full(len(allocated), index, '<u4'))
+        ids.append(allocated.astype('<u4'))
+    raw = numpy.concatenate(records) if records \
+        else numpy.empty(0, raw_dtype)
+
+    time_type = 'datetime64[us]' if convert_times else '<u8'
+    result = numpy.empty(len(raw), [
+        ('file', '<u4'), ('id', '<u4'), ('name', '<U32'), ('type', 'u1'),
+        ('color', 'u1'), ('left_sibling_id', '<u4'),
+        ('right_sibling_id', '<u4'), ('child_id', '<u4'), ('clsid', 'V16'),
+        ('state_bits', '<u4'), ('creation_time', time_type),
+        ('modified_time', time_type), ('sector_start', '<u4'),
+        ('size', '<u8')])
+    if not len(raw):
+        return result
+    result['file'] = numpy.concatenate(files)
+    result['id'] = numpy.concatenate(ids)
+
+    # UTF-16 code units up to name length (without terminating zero) are
+    # widened to UCS-4, NumPy strips trailing zeros itself
+    units = numpy.ascontiguousarray(raw['name']).view('<u2') \
+        .reshape(len(raw), 32)
+    # Signed, so zero length doesn't wrap around
+    lengths = numpy.clip(raw['name_length'].astype('<i4') // 2 - 1, 0, 32)
+    units = numpy.where(numpy.arange(32) < lengths[:, None], units, 0)
+    result['name'] = units.astype('<u4').view('<U32').ravel()
+
+    for column in ('type', 'color', 'left_sibling_id', 'right_sibling_id',
+                   'child_id', 'clsid', 'state_bits', 'sector_start',
+                   'size'):
+        result[column] = raw[column]
+    for column in ('creation_time', 'modified_time'):
+        result[column] = filetime_to_datetime64(raw[column]) \
+            if convert_times else raw[column]
+    return result
+
+
+def arrow_batches(sources, files_per_batch=1024):
+    """
+    Generates pyarrow RecordBatches of directories of `sources`, each batch
+    is built from `files_per_batch` files by to_numpy(). `file` column is
+    dictionary of file names, times are timestamps (null if not set).
+    """
+    import pyarrow
+    from numpy import ascontiguousarray, isnat
+
+    sources = iter(sources)
+    while True:
+        batch = list(islice(sources, files_per_batch))
+        if not batch:
+            return
+
+        array = to_numpy(batch)
+        names = [source if isinstance(source, str) else source.name
+                 for source in batch]
+        arrays = [pyarrow.DictionaryArray.from_arrays(
+            pyarrow.array(array['file'].astype('<i4')), pyarrow.array(names))]
+        for column in COLUMNS[1:]:
+            values = ascontiguousarray(array[column])
+            if column == 'clsid':
+                arrays.append(pyarrow.FixedSizeBinaryArray.from_buffers(
+                    pyarrow.binary(16), len(values),
+                    [None, pyarrow.py_buffer(values.tobytes())]))
+            elif column in ('creation_time', 'modified_time'):
+                arrays.append(pyarrow.array(values, pyarrow.timestamp('us'),
+                                            mask=isnat(values)))
+            else:
+                arrays.append(pyarrow.array(values))
+        yield pyarrow.RecordBatch.from_arrays(arrays, list(COLUMNS))
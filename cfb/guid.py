@@ -0,0 +1,27 @@
+""" GUID type, kept apart from helpers, so uuid is imported only when used """
+from uuid import UUID
+
+__all__ = ['Guid']
+
+
+class Guid(UUID):
+    """
+    UUID microsofication as GUID. Object are same, but have different
+    repr format.
+    """
+    def __init__(self, value):
+        if not isinstance(value, bytes):
+            value = value.encode('latin-1')
+        super(Guid, self).__init__(bytes=value)
+
+    def __repr__(self):
+        return '{%s}' % self
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.bytes == other.bytes
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.bytes)
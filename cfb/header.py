@@ -1,13 +1,16 @@
 """ CFB files header information """
-from six import BytesIO, b
-from struct import unpack, error as UnpackError
-from cfb.constants import GUID_NULL
+from io import BytesIO
+from struct import Struct, error as UnpackError
 
 from cfb.exceptions import MaybeDefected
-from cfb.helpers import Guid
+from cfb.helpers import cached
 
 __all__ = ['Header']
 
+SIGNATURE = Struct('>Q')
+VERSIONS = Struct('<HHHHH')
+COUNTERS = Struct('<LLLLLLLLL')
+
 
 class Header(BytesIO, MaybeDefected):
     """
@@ -23,24 +26,21 @@ class Header(BytesIO, MaybeDefected):
         MaybeDefected.__init__(self, raise_if=source.minimum_defect)
 
         try:
-            if unpack('>Q', self.read(8))[0] != self.signature:
+            if SIGNATURE.unpack(self.read(8))[0] != self.signature:
                 raise UnpackError("Bad signature")
         except UnpackError:
             self._fatal('Identification signature for the compound file '
                         'structure, and MUST be set to the value 0xD0, '
                         '0xCF, 0x11, 0xE0, 0xA1, 0xB1, 0x1A, 0xE1.')
 
-        try:
-            self.clsid = Guid(self.read(16))
-            if self.clsid != GUID_NULL:
-                raise ValueError("Bad CLSID")
-        except ValueError:
+        self._clsid = self.read(16)
+        if self._clsid != b'\0' * 16:
             self._error('Reserved and unused class ID that MUST be set to all '
                         'zeroes (CLSID_NULL).')
 
         try:
             minor, major, byte_order, self.sector_shift, \
-                self.mini_sector_shift = unpack('<HHHHH', self.read(10))
+                self.mini_sector_shift = VERSIONS.unpack(self.read(10))
             if major not in (3, 4):
                 self._error('Version number for breaking changes. This field '
                             'MUST be set to either 0x0003 (version 3) or '
@@ -72,7 +72,7 @@ class Header(BytesIO, MaybeDefected):
                             'specifies the sector size of the Mini Stream as '
                             'a power of 2.')
 
-            if self.read(6) != b('\0' * 6):
+            if self.read(6) != b'\0' * 6:
                 self._error('Reversed field MUST be set to all zeroes.')
 
             # TODO Add additional attributes checks
@@ -80,7 +80,7 @@ class Header(BytesIO, MaybeDefected):
              self.directory_sector_start, self.transaction_count,
              self.cutoff_size, self.minifat_sector_start,
              self.minifat_sector_count, self.difat_sector_start,
-             self.difat_sector_count) = unpack('<LLLLLLLLL', self.read(36))
+             self.difat_sector_count) = COUNTERS.unpack(self.read(36))
 
             if major == 3 and self.directory_sector_count:
                 self._error('If Major Version is 3, then the Number of '
@@ -103,3 +103,9 @@ class Header(BytesIO, MaybeDefected):
 
         except UnpackError:
             self._fatal('Bad file attributes detected.')
+
+    @cached
+    def clsid(self):
+        """ Reserved class ID of file, should be CLSID_NULL """
+        from cfb.guid import Guid
+        return Guid(self._clsid.ljust(16, b'\0'))
@@ -1,9 +1,16 @@
 """ Few helper routines and classes for internal only uses """
-from datetime import datetime
+from array import array
+from bisect import bisect_right
 from os import SEEK_SET
-from six import b, binary_type
-from struct import unpack
-from uuid import UUID
+from struct import Struct
+from sys import byteorder
+
+BYTE = Struct('<B')
+SHORT = Struct('<H')
+LONG = Struct('<L')
+
+# Array typecode of 4-bytes unsigned integers
+LONGS = 'I' if array('I').itemsize == 4 else 'L'
 
 
 class ByteHelpers(object):
@@ -31,40 +38,34 @@ class ByteHelpers(object):
         Returns one byte (as number) from starting position.
         """
         self.seek(start)
-        return unpack('<B', self.read(1))[0]
+        return BYTE.unpack(self.read(1))[0]
 
     def get_short(self, start):
         """
         Returns one short (as 2-bytes number) from starting position.
         """
         self.seek(start)
-        return unpack('<H', self.read(2))[0]
+        return SHORT.unpack(self.read(2))[0]
 
     def get_long(self, start):
         """
         Returns one long (as 4-bytes number) from starting position.
         """
         self.seek(start)
-        return unpack('<L', self.read(4))[0]
-
-
-class Guid(UUID):
-    """
-    UUID microsofication as GUID. Object are same, but have different
-    repr format.
-    """
-    def __init__(self, value):
-        super(Guid, self).__init__(
-            bytes=value if isinstance(value, binary_type) else b(value))
+        return LONG.unpack(self.read(4))[0]
 
-    def __repr__(self):
-        return '{%s}' % self
-
-    def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.bytes == other.bytes
-
-    def __ne__(self, other):
-        return not self.__eq__(other)
+    def get_longs(self, start, count):
+        """
+        Returns array of `count` longs (4-bytes numbers) from starting
+        position, decoded by one read. Array is shorter, if there is not
+        enough data.
+        """
+        self.seek(start)
+        data = self.read(count * 4)
+        result = array(LONGS, data[:len(data) & ~3])
+        if byteorder == 'big':
+            result.byteswap()
+        return result
 
 
 class cached(object):
@@ -79,9 +80,105 @@ class cached(object):
         return value
 
 
+def runs(sectors):
+    """
+    Groups sequence of sectors numbers into (first, count) runs of
+    consecutive sectors, so each run can be read at once.
+    """
+    first, count = None, 0
+    for sector in sectors:
+        if first is not None and sector == first + count:
+            count += 1
+            continue
+        if first is not None:
+            yield first, count
+        first, count = sector, 1
+    if first is not None:
+        yield first, count
+
+
+def extent_starts(extents):
+    """ Offsets in stream, where each of its (position, length) runs starts """
+    starts, total = [], 0
+    for _, size in extents:
+        starts.append(total)
+        total += size
+    return starts
+
+
+def slice_extents(extents, offset, length, starts=None):
+    """
+    Maps byte range of stream to list of (position, length) extents of its
+    container. `extents` are (position, length) runs storing whole stream,
+    their `starts` could be passed, if they are already known.
+    """
+    if starts is None:
+        starts = extent_starts(extents)
+
+    result = []
+    index = bisect_right(starts, offset) - 1
+    while length > 0 and 0 <= index < len(extents):
+        position, size = extents[index]
+        skip = offset - starts[index]
+        part = min(size - skip, length)
+        if part <= 0:
+            break
+        result.append((position + skip, part))
+        offset += part
+        length -= part
+        index += 1
+    return result
+
+
+def merge_ranges(ranges):
+    """
+    Sorts (offset, length) ranges and merges overlapping and adjacent ones
+    into list of [start, end] spans. Empty ranges are skipped.
+    """
+    spans = []
+    for offset, length in sorted(ranges):
+        if length <= 0:
+            continue
+        if spans and offset <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], offset + length)
+        else:
+            spans.append([offset, offset + length])
+    return spans
+
+
+def map_ranges(extents, spans):
+    """
+    Generates (span index, position, length) runs of container storing
+    sorted, not overlapping [start, end] `spans` of stream stored in
+    `extents`. Unlike slice_extents(), extents are walked only once for all
+    spans.
+    """
+    extents = iter(extents)
+    current, base = next(extents, None), 0
+    for index, (start, end) in enumerate(spans):
+        while start < end and current is not None:
+            position, size = current
+            if start >= base + size:
+                base += size
+                current = next(extents, None)
+                continue
+            part = min(base + size, end) - start
+            yield index, position + start - base, part
+            start += part
+
+
 def from_filetime(time):
     """
     Convert Microsoft OLE time to datetime object
     116444736000000000 is January 1, 1970
     """
+    from datetime import datetime
     return datetime.utcfromtimestamp((time - 116444736000000000) / 10000000.)
+
+
+def __getattr__(name):
+    """ Guid lives in cfb.guid now, it's imported on first access """
+    if name == 'Guid':
+        from cfb.guid import Guid
+        return Guid
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
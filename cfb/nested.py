@@ -0,0 +1,97 @@
+""" Compound files embedded in streams of other compound files """
+from os import SEEK_SET, SEEK_CUR, SEEK_END
+
+from cfb.compound import CompoundFile
+from cfb.exceptions import ErrorDefect
+from cfb.helpers import extent_starts, slice_extents
+
+__all__ = ['NestedCfb']
+
+
+class NestedCfb(CompoundFile):
+    """
+    Compound file stored in data of `entry` (from `offset` byte) of other
+    compound file, like embedded OLE objects or attached messages. Embedded
+    file is never copied: entry's extents are mapped to byte ranges of the
+    outermost file when it's opened, so nested files of any depth read the
+    outermost file directly. Nested file keeps its parent alive. See
+    CompoundFile for description of other arguments.
+    """
+    # pylint: disable=R0904, R0913
+    def __init__(self, entry, offset=0, raise_if=ErrorDefect, lazy=False,
+                 stats=None, tracer=None, max_read=None):
+        self.entry = entry
+        self.parent = entry.source
+        self.name = '%s!%s' % (self.parent.name, entry.name)
+        self.size = max(entry.size - offset, 0)
+        self.position = 0
+        self.closed = False
+
+        # Extents of embedded file in parent are mapped through extents of
+        # nested parents, so they are byte ranges of outermost file
+        extents = slice_extents(entry.extents, offset, self.size)
+        if isinstance(self.parent, NestedCfb):
+            extents = [part for position, length in extents
+                       for part in slice_extents(self.parent.extents,
+                                                 position, length,
+                                                 self.parent.starts)]
+            self.outermost = self.parent.outermost
+        else:
+            self.outermost = self.parent
+        self.extents = extents
+        self.starts = extent_starts(self.extents)
+
+        CompoundFile.__init__(self, raise_if=raise_if, lazy=lazy,
+                              stats=stats, tracer=tracer, max_read=max_read)
+
+    def _pread(self, position, size):
+        """ Reads `size` bytes from `position` of outermost file """
+        if self.closed or self.parent.closed:
+            raise ValueError("I/O operation on closed file.")
+        return b''.join(
+            self.outermost.read_at(start, length) for start, length
+            in slice_extents(self.extents, position,
+                             min(size, self.size - position), self.starts))
+
+    def read_at(self, position, size):
+        """ Reads `size` bytes from `position`, current one isn't changed """
+        data = self._pread(position, size)
+        if self.stats is not None:
+            self.stats.reads += 1
+            self.stats.bytes_read += len(data)
+        return data
+
+    def seek(self, offset, whence=SEEK_SET):
+        """ Changes current position """
+        if whence == SEEK_CUR:
+            offset += self.position
+        elif whence == SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("Negative seek position %d" % offset)
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        """ Returns current position """
+        return self.position
+
+    def read(self, size=-1):
+        """ Reads up to `size` bytes from current position """
+        if size is None or size < 0:
+            size = self.size - self.position
+        data = self._pread(self.position, size)
+        self.position += len(data)
+        return data
+
+    def close(self):
+        """
+        Marks file closed and exports its statistics, if they are enabled.
+        Parent file stays opened.
+        """
+        if not self.closed and self.stats is not None:
+            self.stats.export(self.name)
+        self.closed = True
+
+    def __repr__(self):
+        return '<%s "%s">' % (self.__class__.__name__, self.name)
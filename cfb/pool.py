@@ -0,0 +1,221 @@
+""" Compound files sharing bounded pool of file descriptors """
+from collections import OrderedDict
+from contextlib import contextmanager
+from io import FileIO
+from os import SEEK_SET, SEEK_CUR, SEEK_END, fstat
+from threading import Lock
+
+try:
+    from os import pread
+except ImportError:
+    pread = None
+
+from cfb.compound import CompoundFile
+from cfb.exceptions import CfbError, ErrorDefect
+
+__all__ = ['CfbPool', 'PooledCfb']
+
+
+class CfbPool(object):
+    """
+    Pool of at most `max_open` file descriptors shared by many opened
+    compound files. Files keep parsed header, allocation tables and
+    directory in memory, but their descriptors are opened on demand and
+    least recently used ones are closed, when limit is reached. Other
+    keyword arguments are default options of opened files (see CfbIO).
+    Pool counts descriptor `opens`, `hits` and `evictions`.
+    """
+    counters = ('opens', 'hits', 'evictions')
+
+    def __init__(self, max_open=128, **options):
+        if max_open < 1:
+            raise ValueError("Pool must hold at least one descriptor")
+        self.max_open = max_open
+        self.options = options
+        self.lock = Lock()
+        # File name: [FileIO, users count, fingerprint, closed by pool]
+        self.files = OrderedDict()
+        self.reset()
+
+    def reset(self):
+        """ Sets all counters to zero """
+        for counter in self.counters:
+            setattr(self, counter, 0)
+
+    def as_dict(self):
+        """ Returns counters and amount of opened descriptors """
+        result = dict((counter, getattr(self, counter))
+                      for counter in self.counters)
+        result['open'] = len(self.files)
+        return result
+
+    def open(self, name, **options):
+        """
+        Opens compound file `name` with pool's default options updated by
+        `options`. Returns PooledCfb.
+        """
+        arguments = dict(self.options)
+        arguments.update(options)
+        return PooledCfb(self, name, **arguments)
+
+    @contextmanager
+    def descriptor(self, name):
+        """
+        Context manager gives (FileIO, fingerprint) of file `name`, opening
+        it if needed. Descriptor isn't closed by pool while it's used.
+        """
+        with self.lock:
+            item = self.files.get(name)
+            if item is None:
+                opened = FileIO(name, 'rb')
+                status = fstat(opened.fileno())
+                item = [opened, 0, (status.st_size, status.st_mtime_ns,
+                                    status.st_ino), False]
+                self.files[name] = item
+                self.opens += 1
+            else:
+                self.files.move_to_end(name)
+                self.hits += 1
+            item[1] += 1
+
+        try:
+            yield item[0], item[2]
+        finally:
+            with self.lock:
+                item[1] -= 1
+                if item[3] and not item[1]:
+                    item[0].close()
+                self._evict()
+
+    def _evict(self):
+        """ Closes least recently used descriptors, which are not in use """
+        for name in list(self.files):
+            if len(self.files) <= self.max_open:
+                break
+            opened, users, _, _ = self.files[name]
+            if not users:
+                del self.files[name]
+                opened.close()
+                self.evictions += 1
+
+    def close(self):
+        """
+        Closes all pooled descriptors, files reopen them on demand.
+        Descriptors in use are closed by their last user.
+        """
+        with self.lock:
+            while self.files:
+                item = self.files.popitem(last=False)[1]
+                if item[1]:
+                    item[3] = True
+                else:
+                    item[0].close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return len(self.files)
+
+    def __repr__(self):
+        return '<%s %d/%d %s>' % (
+            self.__class__.__name__, len(self.files), self.max_open,
+            ' '.join('%s=%d' % (counter, getattr(self, counter))
+                     for counter in self.counters))
+
+
+class PooledCfb(CompoundFile):
+    """
+    Compound file, which borrows descriptor from CfbPool for every read. It
+    has own position and reads by positional reads, so files of same name
+    share single descriptor. If file is changed on disk since it was opened,
+    CfbError is raised instead of reading stale sectors.
+    """
+    # pylint: disable=R0904, R0913
+    def __init__(self, pool, name, raise_if=ErrorDefect, lazy=False,
+                 stats=None, tracer=None, index_cache=None, max_read=None):
+        self.pool = pool
+        self.name = name
+        self.position = 0
+        self.closed = False
+        with pool.descriptor(name) as (_, fingerprint):
+            self.fingerprint = fingerprint
+        self.size = fingerprint[0]
+
+        CompoundFile.__init__(self, raise_if=raise_if, lazy=lazy,
+                              stats=stats, tracer=tracer,
+                              index_cache=index_cache, max_read=max_read)
+
+    @contextmanager
+    def _descriptor(self):
+        """ Borrows descriptor from pool and checks file is the same """
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        with self.pool.descriptor(self.name) as (opened, fingerprint):
+            if fingerprint != self.fingerprint:
+                raise CfbError("File %s was changed since it was opened." %
+                               self.name)
+            yield opened
+
+    def fileno(self):
+        """
+        Descriptor of file, it's valid only until pool closes it (on any
+        other file access).
+        """
+        with self._descriptor() as opened:
+            return opened.fileno()
+
+    def _pread(self, position, size):
+        """ Reads `size` bytes from `position` of pooled descriptor """
+        with self._descriptor() as opened:
+            if pread is not None:
+                return pread(opened.fileno(), size, position)
+            with self.pool.lock:
+                opened.seek(position)
+                return opened.read(size)
+
+    def read_at(self, position, size):
+        """ Reads `size` bytes from `position`, current one isn't changed """
+        data = self._pread(position, size)
+        if self.stats is not None:
+            self.stats.reads += 1
+            self.stats.bytes_read += len(data)
+        return data
+
+    def seek(self, offset, whence=SEEK_SET):
+        """ Changes current position """
+        if whence == SEEK_CUR:
+            offset += self.position
+        elif whence == SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("Negative seek position %d" % offset)
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        """ Returns current position """
+        return self.position
+
+    def read(self, size=-1):
+        """ Reads up to `size` bytes from current position """
+        if size is None or size < 0:
+            size = max(self.size - self.position, 0)
+        data = self._pread(self.position, size)
+        self.position += len(data)
+        return data
+
+    def close(self):
+        """
+        Marks file closed and exports its statistics, if they are enabled.
+        Descriptor stays in pool.
+        """
+        if not self.closed and self.stats is not None:
+            self.stats.export(self.name)
+        self.closed = True
+
+    def __repr__(self):
+        return '<%s "%s">' % (self.__class__.__name__, self.name)
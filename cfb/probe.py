@@ -0,0 +1,90 @@
+""" Quick detection of compound files by header and root entry only """
+from collections import namedtuple
+from os import fstat
+from struct import Struct
+
+from cfb.directory.entry import RECORD
+from cfb.helpers import from_filetime
+
+__all__ = ['Summary', 'probe']
+
+SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+HEADER = Struct('<8s16sHHHHH6sLLLLLLLLL')
+
+
+class Summary(namedtuple('Summary', 'version sector_size fat_sectors '
+                                    'directory_start root_clsid '
+                                    'root_modified size')):
+    """
+    Immutable summary of probed compound file: (major, minor) `version`,
+    sector size, number of FAT sectors, first directory sector, CLSID and
+    modification time of root storage (None if root entry can't be read)
+    and file `size` (None if unknown).
+    """
+    __slots__ = ()
+
+
+def parse(header, read, size):
+    """
+    Builds summary from 512 bytes of `header` of file of `size` bytes. Root
+    entry record is read by `read(position, size)` function. Headers with
+    sector size other than 512 or 4096 bytes are rejected.
+    """
+    if len(header) < HEADER.size or header[:8] != SIGNATURE:
+        return None
+    (_, _, minor, major, _, sector_shift, _, _, _, fat_sectors,
+     directory_start, _, _, _, _, _, _) = HEADER.unpack_from(header)
+    if sector_shift not in (9, 12):
+        return None
+
+    root_clsid = root_modified = None
+    record = read((directory_start + 1) << sector_shift, RECORD.size)
+    if len(record) == RECORD.size:
+        from cfb.guid import Guid
+        fields = RECORD.unpack(record)
+        root_clsid = Guid(fields[7])
+        try:
+            root_modified = from_filetime(fields[10]) if fields[10] \
+                else None
+        except (ValueError, OverflowError, OSError):
+            root_modified = None
+
+    return Summary((major, minor), 1 << sector_shift, fat_sectors,
+                   directory_start, root_clsid, root_modified, size)
+
+
+def probe(source):
+    """
+    Checks whether `source` (file name, bytes or binary file object) is
+    compound file. Only 512 bytes of header and root entry record are read,
+    no CfbIO is created. Returns Summary or None, if it's not compound file.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = memoryview(source)
+
+        def read_data(position, size):
+            """ Record from memory """
+            return data[position:position + size].tobytes()
+
+        return parse(data[:512].tobytes(), read_data, len(data))
+
+    if hasattr(source, 'read'):
+        return _probe_file(source)
+    with open(source, 'rb', 0) as opened:
+        return _probe_file(opened)
+
+
+def _probe_file(opened):
+    """ Probes opened binary file """
+    def read_file(position, size):
+        """ Record from file """
+        opened.seek(position)
+        return opened.read(size)
+
+    opened.seek(0)
+    header = opened.read(512)
+    try:
+        size = fstat(opened.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        size = None
+    return parse(header, read_file, size)
@@ -0,0 +1,295 @@
+""" Property set streams (MS-OLEPS), e.g. "\\x05SummaryInformation" """
+from datetime import timedelta
+from struct import Struct, error as UnpackError
+
+from cfb.exceptions import MaybeDefected, ErrorDefect
+from cfb.guid import Guid
+from cfb.helpers import from_filetime
+
+__all__ = ['PropertySetStream', 'PropertySet', 'FMTID_SUMMARY_INFORMATION',
+           'FMTID_DOC_SUMMARY_INFORMATION', 'FMTID_USER_DEFINED_PROPERTIES']
+
+FMTID_SUMMARY_INFORMATION = Guid(
+    b'\xe0\x85\x9f\xf2\xf9\x4f\x68\x10\xab\x91\x08\x00\x2b\x27\xb3\xd9')
+FMTID_DOC_SUMMARY_INFORMATION = Guid(
+    b'\x02\xd5\xcd\xd5\x9c\x2e\x1b\x10\x93\x97\x08\x00\x2b\x2c\xf9\xae')
+FMTID_USER_DEFINED_PROPERTIES = Guid(
+    b'\x05\xd5\xcd\xd5\x9c\x2e\x1b\x10\x93\x97\x08\x00\x2b\x2c\xf9\xae')
+
+# Names of well-known properties IDs of every format
+NAMES = {
+    FMTID_SUMMARY_INFORMATION: dict(
+        codepage=1, title=2, subject=3, author=4, keywords=5, comments=6,
+        template=7, last_author=8, revision=9, edit_time=10,
+        last_printed=11, created=12, last_saved=13, pages=14, words=15,
+        chars=16, thumbnail=17, app_name=18, security=19),
+    FMTID_DOC_SUMMARY_INFORMATION: dict(
+        codepage=1, category=2, presentation_target=3, bytes=4, lines=5,
+        paragraphs=6, slides=7, notes=8, hidden_slides=9, mm_clips=10,
+        scale=11, heading_pairs=12, titles_of_parts=13, manager=14,
+        company=15, links_dirty=16, chars_with_spaces=17, shared_doc=19,
+        hyperlinks_changed=22, version=23),
+}
+
+# Properties storing time spans, not dates, as FILETIME
+DURATIONS = set([(FMTID_SUMMARY_INFORMATION, 10)])
+
+HEADER = Struct('<HH4s16sL')
+FORMAT = Struct('<16sL')
+SET = Struct('<LL')
+PAIR = Struct('<LL')
+TYPE = Struct('<HH')
+LONG = Struct('<L')
+
+VT_EMPTY = 0x0000
+VT_NULL = 0x0001
+VT_I2 = 0x0002
+VT_I4 = 0x0003
+VT_R4 = 0x0004
+VT_R8 = 0x0005
+VT_BOOL = 0x000b
+VT_VARIANT = 0x000c
+VT_I1 = 0x0010
+VT_UI1 = 0x0011
+VT_UI2 = 0x0012
+VT_UI4 = 0x0013
+VT_I8 = 0x0014
+VT_UI8 = 0x0015
+VT_INT = 0x0016
+VT_UINT = 0x0017
+VT_LPSTR = 0x001e
+VT_LPWSTR = 0x001f
+VT_FILETIME = 0x0040
+VT_BLOB = 0x0041
+VT_CF = 0x0047
+VT_CLSID = 0x0048
+VT_VECTOR = 0x1000
+
+# Fixed size types: (struct, size of value in vector)
+SCALARS = {
+    VT_I2: (Struct('<h'), 2), VT_I4: (Struct('<l'), 4),
+    VT_R4: (Struct('<f'), 4), VT_R8: (Struct('<d'), 8),
+    VT_BOOL: (Struct('<H'), 2), VT_I1: (Struct('<b'), 1),
+    VT_UI1: (Struct('<B'), 1), VT_UI2: (Struct('<H'), 2),
+    VT_UI4: (Struct('<L'), 4), VT_I8: (Struct('<q'), 8),
+    VT_UI8: (Struct('<Q'), 8), VT_INT: (Struct('<l'), 4),
+    VT_UINT: (Struct('<L'), 4), VT_FILETIME: (Struct('<Q'), 8),
+}
+
+# Code pages which names aren't "cp" + number
+CODECS = {1200: 'utf-16-le', 1201: 'utf-16-be', 10000: 'mac-roman',
+          20127: 'ascii', 28591: 'latin-1', 65000: 'utf-7', 65001: 'utf-8'}
+
+
+class PropertySet(MaybeDefected):
+    """
+    Single property set of format `fmtid`. Only offsets table is parsed on
+    creation, property values are decoded from `view` (memoryview of whole
+    stream) on first access by ID or by well-known name.
+    """
+    def __init__(self, view, offset, fmtid, raise_if=ErrorDefect):
+        MaybeDefected.__init__(self, raise_if=raise_if)
+        self.view = view
+        self.offset = offset
+        self.fmtid = fmtid
+        self.names = NAMES.get(fmtid, {})
+        self._values = {}
+
+        try:
+            size, count = SET.unpack_from(view, offset)
+            if offset + size > len(view) or \
+                    count * PAIR.size + SET.size > size:
+                raise UnpackError("Property set is out of stream")
+            self.offsets = dict(
+                PAIR.unpack_from(view, offset + SET.size + i * PAIR.size)
+                for i in range(count))
+        except UnpackError:
+            self._error("Property set is truncated.")
+            self.offsets = {}
+
+    @property
+    def codec(self):
+        """ Name of codec of 8-bit strings (from CodePage property) """
+        codepage = self.get(1)
+        if codepage is None:
+            return 'latin-1'
+        return CODECS.get(codepage, 'cp%d' % codepage)
+
+    def ids(self):
+        """ Returns sorted list of stored properties IDs """
+        return sorted(self.offsets)
+
+    def get(self, key, default=None):
+        """ Returns value of property `key` (ID or name) or `default` """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self):
+        """
+        Decodes all properties, returns dictionary of their values by names
+        (or IDs, if they have no well-known names).
+        """
+        names = dict((value, name) for name, value in self.names.items())
+        return dict((names.get(pid, pid), self[pid]) for pid in self.ids()
+                    if pid != 0)
+
+    def __contains__(self, key):
+        return self.names.get(key, key) in self.offsets
+
+    def __getitem__(self, key):
+        pid = self.names.get(key, key)
+        if pid in self._values:
+            return self._values[pid]
+        if pid not in self.offsets:
+            raise KeyError(key)
+
+        position = self.offset + self.offsets[pid]
+        try:
+            if (self.fmtid, pid) in DURATIONS:
+                value = self._duration(position)
+            else:
+                value, _ = self._value(position)
+        except (UnpackError, UnicodeDecodeError, LookupError, ValueError):
+            self._error("Property %d of set %r can't be decoded." %
+                        (pid, self.fmtid))
+            value = None
+        if pid == 1 and value is not None:
+            # Code page is stored as signed short, but it's unsigned
+            value &= 0xffff
+        self._values[pid] = value
+        return value
+
+    def _duration(self, position):
+        """ Decodes time span stored as FILETIME at `position` """
+        kind, _ = TYPE.unpack_from(self.view, position)
+        if kind != VT_FILETIME:
+            return self._value(position)[0]
+        value, = SCALARS[VT_FILETIME][0].unpack_from(
+            self.view, position + TYPE.size)
+        return timedelta(microseconds=value // 10)
+
+    def _value(self, position):
+        """
+        Decodes typed property value stored at `position`, returns the value
+        and position after it.
+        """
+        kind, _ = TYPE.unpack_from(self.view, position)
+        position += TYPE.size
+
+        if kind & VT_VECTOR:
+            count, = LONG.unpack_from(self.view, position)
+            position += LONG.size
+            kind &= ~VT_VECTOR
+            values = []
+            for _ in range(count):
+                if kind == VT_VARIANT:
+                    value, position = self._value(position)
+                else:
+                    value, position = self._scalar(kind, position, True)
+                values.append(value)
+            return values, position
+
+        return self._scalar(kind, position, False)
+
+    def _scalar(self, kind, position, packed):
+        """
+        Decodes value of `kind` type at `position`. Values in vectors are
+        `packed`, otherwise every value is padded to 4 bytes.
+        """
+        # pylint: disable=R0911, R0912
+        view = self.view
+        if kind in SCALARS:
+            structure, size = SCALARS[kind]
+            value, = structure.unpack_from(view, position)
+            if kind == VT_BOOL:
+                value = bool(value)
+            elif kind == VT_FILETIME:
+                value = from_filetime(value) if value else None
+            return value, position + (size if packed else max(size, 4))
+
+        if kind in (VT_EMPTY, VT_NULL):
+            return None, position
+
+        if kind in (VT_LPSTR, VT_LPWSTR, VT_BLOB, VT_CF):
+            size, = LONG.unpack_from(view, position)
+            position += LONG.size
+            if kind == VT_LPWSTR:
+                size *= 2
+            end = position + size
+            if end > len(view):
+                raise UnpackError("Value is out of stream")
+            data = view[position:end]
+            if kind == VT_LPSTR:
+                value = data.tobytes().decode(self.codec)
+                value = value.split('\0', 1)[0]
+            elif kind == VT_LPWSTR:
+                value = data.tobytes().decode('utf-16-le')
+                value = value.split('\0', 1)[0]
+            else:
+                value = data.tobytes()
+            if kind == VT_LPSTR and packed and self.codec != 'utf-16-le':
+                return value, end
+            return value, end + (-size & 3)
+
+        if kind == VT_CLSID:
+            return Guid(view[position:position + 16].tobytes()), \
+                position + 16
+
+        raise ValueError("Unsupported property type 0x%04x" % kind)
+
+    def __repr__(self):
+        return '<%s %r>' % (self.__class__.__name__, self.fmtid)
+
+
+class PropertySetStream(MaybeDefected):
+    """
+    Property set stream (MS-OLEPS) stored in directory `entry`, usually
+    "\\x05SummaryInformation" or "\\x05DocumentSummaryInformation". Stream
+    is read at once, header and offsets tables are parsed on creation and
+    values are decoded from memory only when they are requested.
+    """
+    def __init__(self, entry):
+        MaybeDefected.__init__(self, raise_if=entry.minimum_defect)
+        entry.check_budget(entry.size)
+        self.view = memoryview(b''.join(entry.chunks()))
+
+        self.sets = []
+        try:
+            (byte_order, self.version, _, clsid, count) = \
+                HEADER.unpack_from(self.view)
+        except UnpackError:
+            self._fatal("Property set stream header is truncated.")
+            return
+
+        if byte_order != 0xfffe:
+            self._fatal("Property set stream byte order MUST be 0xFFFE.")
+        if self.version not in (0, 1):
+            self._warning("Property set stream version MUST be 0 or 1.")
+        self.clsid = Guid(clsid)
+
+        for i in range(count):
+            try:
+                fmtid, offset = FORMAT.unpack_from(
+                    self.view, HEADER.size + i * FORMAT.size)
+            except UnpackError:
+                self._error("Property set stream header is truncated.")
+                break
+            self.sets.append(PropertySet(self.view, offset, Guid(fmtid),
+                                         self.minimum_defect))
+
+    def __getitem__(self, item):
+        """ Property set by its index or format ID """
+        if isinstance(item, Guid):
+            for properties in self.sets:
+                if properties.fmtid == item:
+                    return properties
+            raise KeyError(item)
+        return self.sets[item]
+
+    def __len__(self):
+        return len(self.sets)
+
+    def __repr__(self):
+        return '<%s of %d sets>' % (self.__class__.__name__, len(self.sets))
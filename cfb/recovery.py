@@ -0,0 +1,186 @@
+""" Recovery of data not referenced by directory (forensic triage) """
+from collections import namedtuple
+
+from cfb.constants import UNALLOCATED, STREAM, ROOT, MAXREGSECT, \
+    ENDOFCHAIN, FREESECT
+from cfb.directory.entry import RECORD
+from cfb.helpers import runs, slice_extents
+
+__all__ = ['Finding', 'scan', 'DELETED', 'SLACK', 'ORPHAN', 'FREE']
+
+DELETED = "deleted"
+SLACK = "slack"
+ORPHAN = "orphan"
+FREE = "free"
+
+
+class Finding(namedtuple('Finding', 'kind entry_id name mini extents')):
+    """
+    Candidate of unreferenced data. Kind is "deleted" (unallocated
+    directory entry still having name or data), "slack" (bytes after
+    stream's size in its last sector), "orphan" (allocated sectors chain no
+    entry refers to) or "free" (run of free sectors). `entry_id` and `name`
+    are set for entries only, `mini` is True for data in mini stream.
+    `extents` are (position, length) byte ranges in file.
+    """
+    __slots__ = ()
+
+
+def follow(table, start, limit, total):
+    """
+    Follows chain of allocation `table` from `start`. Stops after `limit`
+    sectors, on any special value, on sector beyond first `total` ones
+    (they are beyond end of file) or on already visited sector.
+    """
+    sectors, seen = [], set()
+    total = min(total, len(table))
+    while start < total and len(sectors) < limit and start not in seen:
+        seen.add(start)
+        sectors.append(start)
+        start = table[start]
+    return sectors
+
+
+class Scanner(object):
+    """
+    One pass over raw directory table and in-memory FAT and mini-FAT of
+    opened `source`. Directory entries are parsed from table records, so
+    unallocated ones are not rejected as defects.
+    """
+    def __init__(self, source):
+        self.source = source
+        header = source.header
+        self.shift = header.sector_shift
+        self.mini_shift = header.mini_sector_shift
+        self.cutoff = header.cutoff_size
+
+        self.fat = source.fat
+        self.minifat = source.minifat
+        # Sectors beyond end of file are listed in FAT, but hold nothing
+        self.sectors = min(len(self.fat), -(-source.size >> self.shift) - 1)
+        self.mini_sectors = min(len(self.minifat),
+                                source.root.size >> self.mini_shift)
+        self.used = bytearray(len(self.fat))
+        self.mini_used = bytearray(len(self.minifat))
+
+        for chain in (source.directory.sectors,
+                      source.chain(header.minifat_sector_start)):
+            self.mark(chain, self.used)
+
+    def mark(self, sectors, used):
+        """
+        Marks `sectors` as referenced, sectors out of allocation table are
+        reported and skipped.
+        """
+        for sector in sectors:
+            if sector < len(used):
+                used[sector] = 1
+            else:
+                self.source._error("Sector %d is out of allocation table." %
+                                   sector)
+
+    def extents(self, sectors, mini):
+        """ Byte ranges of listed sectors (or mini sectors) in file """
+        result = []
+        shift = self.mini_shift if mini else self.shift
+        for first, count in runs(sectors):
+            if mini:
+                result.extend(slice_extents(self.source.root.extents,
+                                            first << shift, count << shift))
+            else:
+                result.append(((first + 1) << shift, count << shift))
+        return result
+
+    def records(self):
+        """ Generates (entry_id, name, type, start, size) of table records """
+        table = self.source.directory.table
+        for entry_id in range(len(table) // RECORD.size):
+            (name, length, kind, _, _, _, _, _, _, _, _, start, size) = \
+                RECORD.unpack_from(table, entry_id * RECORD.size)
+            name = name[:length].decode("utf-16-le", "replace") \
+                .rstrip("\0")
+            yield entry_id, name, kind, start, size
+
+    def entries(self):
+        """
+        Marks sectors of allocated entries as used and generates findings of
+        deleted entries and slack space.
+        """
+        for entry_id, name, kind, start, size in self.records():
+            mini = kind != ROOT and size < self.cutoff
+            shift = self.mini_shift if mini else self.shift
+            count = -(-size >> shift)
+            table = self.minifat if mini else self.fat
+            total = self.mini_sectors if mini else self.sectors
+
+            if kind == UNALLOCATED:
+                if name or size:
+                    extents = self.extents(
+                        follow(table, start, count, total), mini)
+                    yield Finding(DELETED, entry_id, name, mini,
+                                  slice_extents(extents, 0, size))
+                continue
+            if kind not in (STREAM, ROOT) or not size:
+                continue
+
+            sectors = follow(table, start, count, total)
+            self.mark(sectors, self.mini_used if mini else self.used)
+            tail = size & ((1 << shift) - 1)
+            if kind == STREAM and tail and len(sectors) == count:
+                extents = self.extents(sectors[-1:], mini)
+                yield Finding(SLACK, entry_id, name, mini,
+                              slice_extents(extents, tail,
+                                            (1 << shift) - tail))
+
+    def unreferenced(self, table, used, total, mini):
+        """
+        Generates orphan chains and runs of free sectors of allocation
+        `table` among its first `total` sectors.
+        """
+        pointed = bytearray(len(table))
+        free = []
+        for sector in range(total):
+            following = table[sector]
+            if used[sector]:
+                continue
+            if following == FREESECT:
+                free.append(sector)
+            elif following < len(table):
+                pointed[following] = 1
+
+        # Heads of chains first, then whatever is left (cyclic chains)
+        for heads in (True, False):
+            for sector in range(total):
+                if used[sector] or heads and pointed[sector] or \
+                        MAXREGSECT < table[sector] != ENDOFCHAIN:
+                    continue
+                chain = follow(table, sector, total, total)
+                self.mark(chain, used)
+                yield Finding(ORPHAN, None, None, mini,
+                              self.extents(chain, mini))
+
+        for first, count in runs(free):
+            yield Finding(FREE, None, None, mini,
+                          self.extents(range(first, first + count), mini))
+
+    def __iter__(self):
+        for finding in self.entries():
+            yield finding
+
+        for finding in self.unreferenced(self.fat, self.used, self.sectors,
+                                         False):
+            yield finding
+
+        for finding in self.unreferenced(self.minifat, self.mini_used,
+                                         self.mini_sectors, True):
+            yield finding
+
+
+def scan(source):
+    """
+    Generates findings (see Finding) of data in opened `source` which
+    directory doesn't reference: deleted entries, slack space after streams
+    data, orphan sectors chains and free sectors (both in file and in mini
+    stream).
+    """
+    return iter(Scanner(source))
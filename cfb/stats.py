@@ -0,0 +1,90 @@
+""" Opt-in IO and internal structures traversal counters """
+from weakref import ref
+
+from cfb.tracing import Span, Tracer
+
+__all__ = ['Stats']
+
+
+class Stats(Tracer):
+    """
+    Statistics of single opened CFB file: amount of system calls and read
+    bytes, FAT and mini-FAT hops, parsed directory entries, cache hits and
+    time spent in processing phases. Pass instance to CfbIO to enable it,
+    disabled statistics cost nothing. If `exporter` callable is set, it is
+    called with file name and dictionary of counters when file is closed.
+    """
+    # pylint: disable=R0902
+    counters = ('seeks', 'reads', 'bytes_read', 'fat_hops', 'minifat_hops',
+                'entries_parsed', 'entry_reads', 'cache_hits')
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self.phases = {}
+        self.active = {}
+        self.reset()
+
+    def reset(self):
+        """ Sets all counters and phase times to zero """
+        for counter in self.counters:
+            setattr(self, counter, 0)
+        self.phases.clear()
+
+    def attach(self, source):
+        """
+        Replaces `seek` and `read` methods of `source` object by counting
+        ones. Only instance is touched, so other files stay as fast as usual.
+        Source is referred weakly, so it's still freed as soon as dropped.
+        """
+        seek, read = type(source).seek, type(source).read
+        owner = ref(source)
+
+        def counting_seek(*args, **kwargs):
+            """ Seeks and counts call """
+            self.seeks += 1
+            return seek(owner(), *args, **kwargs)
+
+        def counting_read(*args, **kwargs):
+            """ Reads and counts call and read bytes """
+            data = read(owner(), *args, **kwargs)
+            self.reads += 1
+            self.bytes_read += len(data)
+            return data
+
+        source.seek = counting_seek
+        source.read = counting_read
+
+    def phase(self, name):
+        """ Returns context manager measuring time of `name` phase """
+        return Span((self,), name)
+
+    def start(self, span):
+        """
+        Starts measuring of span's phase. Nested spans with same name are
+        measured only once, by the outermost one.
+        """
+        self.active.setdefault(span.name, span)
+
+    def end(self, span):
+        """ Adds span's duration to its phase time """
+        if self.active.get(span.name) is span:
+            del self.active[span.name]
+            self.phases[span.name] = \
+                self.phases.get(span.name, 0.0) + span.duration
+
+    def as_dict(self):
+        """ Returns counters and phase times as a plain dictionary """
+        result = dict((counter, getattr(self, counter))
+                      for counter in self.counters)
+        result['phases'] = dict(self.phases)
+        return result
+
+    def export(self, name):
+        """ Passes current statistics of file `name` to exporter """
+        if self.exporter is not None:
+            self.exporter(name, self.as_dict())
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, ' '.join(
+            '%s=%d' % (counter, getattr(self, counter))
+            for counter in self.counters))
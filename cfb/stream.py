@@ -0,0 +1,132 @@
+""" Reading compound files from non-seekable input (pipes, sockets) """
+from io import BytesIO
+from os import SEEK_SET, SEEK_CUR, SEEK_END
+from sys import maxsize
+
+from cfb.compound import CompoundFile
+from cfb.exceptions import ErrorDefect
+
+__all__ = ['Spool', 'CfbStream']
+
+
+class Spool(object):
+    """
+    Seekable read-only view of non-seekable `source`. Data are pulled from
+    source by `chunk_size` blocks only when they are needed, and only as far
+    as needed. Pulled data are kept in memory until `threshold` bytes, then
+    they are spilled to temporary file.
+    """
+    def __init__(self, source, threshold=2 ** 22, chunk_size=2 ** 16):
+        self.source = source
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.buffer = BytesIO()
+        self.spilled = False
+        self.finished = False
+        self.length = 0
+        self.position = 0
+
+    @property
+    def name(self):
+        """ Name of source if it has one """
+        return getattr(self.source, 'name', '<stream>')
+
+    @property
+    def size(self):
+        """
+        Size of whole input. Until input is finished it's unknown and
+        size is reported as maximal possible.
+        """
+        return self.length if self.finished else maxsize
+
+    @property
+    def closed(self):
+        """ True if spool buffer was closed """
+        return self.buffer.closed
+
+    def fill(self, end=None):
+        """
+        Pulls data from source by `chunk_size` blocks until `end` bytes are
+        available or source is finished. Without `end` whole source is
+        pulled. Data are spilled as soon as threshold is crossed, so no more
+        than threshold and one block is kept in memory.
+        """
+        while not self.finished and (end is None or self.length < end):
+            chunk = self.source.read(self.chunk_size)
+            if not chunk:
+                self.finished = True
+                break
+
+            if not self.spilled and \
+                    self.length + len(chunk) > self.threshold:
+                from shutil import copyfileobj
+                from tempfile import TemporaryFile
+                spill = TemporaryFile()
+                self.buffer.seek(0)
+                copyfileobj(self.buffer, spill)
+                self.buffer = spill
+                self.spilled = True
+
+            self.buffer.seek(self.length)
+            self.buffer.write(chunk)
+            self.length += len(chunk)
+
+    def seek(self, offset, whence=SEEK_SET):
+        """ Changes current position, seeking from end pulls whole input """
+        if whence == SEEK_CUR:
+            offset += self.position
+        elif whence == SEEK_END:
+            self.fill()
+            offset += self.length
+        if offset < 0:
+            raise ValueError("Negative seek position %d" % offset)
+
+        self.position = offset
+        return self.position
+
+    def tell(self):
+        """ Returns current position """
+        return self.position
+
+    def read(self, size=-1):
+        """ Reads up to `size` bytes, pulling them from input if needed """
+        if size is None or size < 0:
+            self.fill()
+            size = max(self.length - self.position, 0)
+        else:
+            self.fill(self.position + size)
+
+        self.buffer.seek(self.position)
+        data = self.buffer.read(max(min(size, self.length - self.position),
+                                    0))
+        self.position += len(data)
+        return data
+
+    def close(self):
+        """ Drops spooled data, source stays opened """
+        self.buffer.close()
+
+
+class CfbStream(Spool, CompoundFile):
+    """
+    Compound file read from non-seekable input. Header is parsed as soon as
+    it arrives, directory is lazy-loaded by default, so its entries (e.g.
+    via directory.walk()) are available as soon as their sectors (and FAT)
+    arrive. See CompoundFile for description of other arguments.
+    """
+    # pylint: disable=R0904, R0913
+    def __init__(self, source, threshold=2 ** 22, chunk_size=2 ** 16,
+                 raise_if=ErrorDefect, lazy=True, stats=None, tracer=None,
+                 max_read=None):
+        Spool.__init__(self, source, threshold, chunk_size)
+        CompoundFile.__init__(self, raise_if=raise_if, lazy=lazy,
+                              stats=stats, tracer=tracer, max_read=max_read)
+
+    def close(self):
+        """ Drops spooled data and exports statistics, if they are enabled """
+        if not self.closed and self.stats is not None:
+            self.stats.export(self.name)
+        super(CfbStream, self).close()
+
+    def __repr__(self):
+        return '<%s "%s">' % (self.__class__.__name__, self.name)
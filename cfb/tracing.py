@@ -0,0 +1,123 @@
+""" Tracing hooks around file processing phases """
+from threading import current_thread
+from time import perf_counter
+
+__all__ = ['Tracer', 'Span', 'TimelineTracer', 'OpenTelemetryTracer']
+
+
+class Span(object):
+    """
+    Context manager describes one processing phase: its name, file, entry
+    id and byte range (when they make sense) and duration. Every tracer
+    is notified when span starts and ends.
+    """
+    # pylint: disable=R0902, R0903, R0913
+    __slots__ = ('tracers', 'name', 'filename', 'entry_id', 'offset', 'size',
+                 'started', 'duration')
+
+    def __init__(self, tracers, name, filename=None, entry_id=None,
+                 offset=None, size=None):
+        self.tracers = tracers
+        self.name = name
+        self.filename = filename
+        self.entry_id = entry_id
+        self.offset = offset
+        self.size = size
+        self.started = None
+        self.duration = None
+
+    def __enter__(self):
+        self.started = perf_counter()
+        for tracer in self.tracers:
+            tracer.start(self)
+        return self
+
+    def __exit__(self, *_):
+        self.duration = perf_counter() - self.started
+        for tracer in reversed(self.tracers):
+            tracer.end(self)
+
+    def attributes(self):
+        """ Returns dictionary of defined span attributes """
+        return dict((name, getattr(self, name)) for name in
+                    ('filename', 'entry_id', 'offset', 'size')
+                    if getattr(self, name) is not None)
+
+    def __repr__(self):
+        return '<%s "%s" %r>' % (self.__class__.__name__, self.name,
+                                 self.attributes())
+
+
+class NullSpan(object):
+    """ Does nothing, used when nobody traces current file """
+    # pylint: disable=R0903
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer(object):
+    """
+    Base class of tracers. Subclass it and redefine start() and end()
+    methods to receive spans of processing phases: "header", "index"
+    (index cache loading and saving), "fat" (FAT, DIFAT and mini-FAT
+    loading), "directory", "entry" (single directory entry parsing),
+    "chain" (sectors chain building) and "read" (entry data reading).
+    """
+    def start(self, span):
+        """ Called when `span` starts """
+
+    def end(self, span):
+        """ Called when `span` ends, its duration is already known """
+
+
+class TimelineTracer(Tracer):
+    """
+    Collects finished spans to build timeline of file processing. Timeline
+    can be exported in Chrome Trace Event format and viewed as flame graph
+    in chrome://tracing, Perfetto or speedscope.
+    """
+    def __init__(self):
+        self.spans = []
+        self.origin = perf_counter()
+
+    def end(self, span):
+        self.spans.append((current_thread().ident, span))
+
+    def events(self):
+        """ Returns list of complete ("X") trace events """
+        return [dict(name=span.name, ph="X", pid=0, tid=thread,
+                     ts=(span.started - self.origin) * 1e6,
+                     dur=span.duration * 1e6, args=span.attributes())
+                for thread, span in self.spans]
+
+    def dump(self, output):
+        """ Writes timeline as JSON trace to `output` file-like object """
+        from json import dump
+        dump(dict(traceEvents=self.events()), output)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Adapts OpenTelemetry-style tracer (any object with start_span(name,
+    attributes=...) method, returning span with end() method), so every
+    processing phase becomes span in caller's current trace.
+    """
+    def __init__(self, tracer, prefix="cfb."):
+        self.tracer = tracer
+        self.prefix = prefix
+        self.opened = {}
+
+    def start(self, span):
+        self.opened[id(span)] = self.tracer.start_span(
+            self.prefix + span.name, attributes=span.attributes())
+
+    def end(self, span):
+        self.opened.pop(id(span)).end()
@@ -0,0 +1,245 @@
+""" VBA projects (MS-OVBA): dir stream and compressed modules source """
+from codecs import getincrementaldecoder
+from collections import namedtuple
+from struct import Struct, error as UnpackError
+
+from cfb.exceptions import MaybeDefected, ErrorDefect
+from cfb.properties import CODECS
+
+__all__ = ['VbaProject', 'Module', 'decompress', 'iter_decompress']
+
+RECORD = Struct('<HL')
+SHORT = Struct('<H')
+LONG = Struct('<L')
+
+PROJECTCODEPAGE = 0x0003
+PROJECTVERSION = 0x0009
+MODULENAME = 0x0019
+MODULENAMEUNICODE = 0x0047
+MODULESTREAMNAME = 0x001a
+MODULEOFFSET = 0x0031
+MODULETYPE_PROCEDURAL = 0x0021
+MODULETERMINATOR = 0x002b
+
+# Size of copy token bit field by decompressed chunk length (difference)
+BIT_COUNTS = bytearray(max((difference - 1).bit_length(), 4)
+                       for difference in range(4097))
+
+
+class Module(namedtuple('Module', 'name stream offset procedural')):
+    """
+    VBA module described in dir stream: its `name`, name of `stream`
+    storing it, `offset` of compressed source in this stream and module
+    type (procedural or document/class one).
+    """
+    __slots__ = ()
+
+
+def decompress_chunk(data, position, end):
+    """
+    Decompresses token sequences of compressed chunk stored in `data`
+    (bytearray) between `position` and `end`.
+    """
+    output = bytearray()
+    while position < end:
+        flags = data[position]
+        position += 1
+        if not flags and position + 8 <= end:
+            # Eight literals in a row, usual for text
+            output += data[position:position + 8]
+            position += 8
+            continue
+
+        for bit in range(8):
+            if position >= end:
+                break
+            if not flags >> bit & 1:
+                output.append(data[position])
+                position += 1
+                continue
+
+            if position + 2 > end:
+                raise ErrorDefect("Copy token is truncated.")
+            token = data[position] | data[position + 1] << 8
+            position += 2
+
+            difference = len(output)
+            bit_count = BIT_COUNTS[difference] if difference <= 4096 else 12
+            length = (token & (0xffff >> bit_count)) + 3
+            offset = (token >> (16 - bit_count)) + 1
+            source = difference - offset
+            if source < 0:
+                raise ErrorDefect("Copy token refers before chunk start.")
+
+            if offset >= length:
+                output += output[source:source + length]
+            else:
+                # Overlapping copy repeats last `offset` bytes
+                pattern = output[source:]
+                output += (pattern * (length // offset + 1))[:length]
+    return output
+
+
+def iter_decompress(chunks):
+    """
+    Decompresses MS-OVBA compressed container read from `chunks` iterable
+    of byte strings. Generates decompressed data by chunks (4096 bytes at
+    most), so only current compressed chunk is held in memory.
+    """
+    buffer = bytearray()
+    position = None
+    finished = False
+    chunks = iter(chunks)
+
+    while not finished:
+        data = next(chunks, None)
+        if data is None:
+            finished = True
+        else:
+            buffer += data
+
+        if position is None:
+            if not buffer:
+                continue
+            if buffer[0] != 0x01:
+                raise ErrorDefect("Compressed container signature MUST be "
+                                  "0x01.")
+            position = 1
+
+        while len(buffer) - position >= 2:
+            header = buffer[position] | buffer[position + 1] << 8
+            size = (header & 0x0fff) + 3
+            end = position + size
+            if end > len(buffer):
+                if not finished:
+                    break
+                # Last chunk could be truncated, decompress what's left
+                end = len(buffer)
+            if header >> 12 & 0x07 != 0x03:
+                raise ErrorDefect("Compressed chunk signature MUST be 0b011.")
+
+            if header & 0x8000:
+                yield bytes(decompress_chunk(buffer, position + 2, end))
+            else:
+                yield bytes(buffer[position + 2:end])
+            position = end
+
+        if position:
+            del buffer[:position]
+            position = 0
+
+
+def decompress(data):
+    """ Decompresses whole MS-OVBA compressed container """
+    return b''.join(iter_decompress((data,)))
+
+
+class VbaProject(MaybeDefected):
+    """
+    VBA project stored in `source` file. `path` of VBA storage (like
+    "_VBA_PROJECT_CUR/VBA" in Excel or "Macros/VBA" in Word documents) is
+    found by dir stream, if it's not set. Only dir stream is decompressed
+    on creation, modules source is decompressed on demand, chunk by chunk.
+    """
+    def __init__(self, source, path=None):
+        MaybeDefected.__init__(self, raise_if=source.minimum_defect)
+        self.source = source
+
+        if path is None:
+            found = sorted(name for name in source.directory.paths
+                           if name == "VBA/dir" or name.endswith("/VBA/dir"))
+            if not found:
+                raise KeyError("VBA/dir")
+            path = found[0][:-len("/dir")]
+        self.path = path
+
+        self.codepage = 1252
+        self.modules = []
+        entry = source.directory.by_path(path + "/dir")
+        entry.check_budget(entry.size)
+        self._parse(decompress(b''.join(entry.chunks())))
+
+    @property
+    def codec(self):
+        """ Name of codec of modules source and names """
+        return CODECS.get(self.codepage, 'cp%d' % self.codepage)
+
+    def records(self, data):
+        """ Generates (id, data) of dir stream records """
+        position = 0
+        while position + RECORD.size <= len(data):
+            record_id, size = RECORD.unpack_from(data, position)
+            position += RECORD.size
+            if record_id == PROJECTVERSION:
+                # Size is reserved field here, version is 6 bytes long
+                size = 6
+            if position + size > len(data):
+                self._error("Record 0x%04x of dir stream is truncated." %
+                            record_id)
+                return
+            yield record_id, data[position:position + size]
+            position += size
+
+    def _parse(self, data):
+        """ Reads codepage and modules descriptions from dir stream """
+        module = {}
+        for record_id, value in self.records(data):
+            try:
+                if record_id == PROJECTCODEPAGE:
+                    self.codepage, = SHORT.unpack(value)
+                elif record_id == MODULENAME:
+                    module = dict(name=value.decode(self.codec), offset=0,
+                                  procedural=False)
+                    module["stream"] = module["name"]
+                elif record_id == MODULENAMEUNICODE and module:
+                    module["name"] = value.decode("utf-16-le")
+                elif record_id == MODULESTREAMNAME and module:
+                    module["stream"] = value.decode(self.codec)
+                elif record_id == MODULEOFFSET and module:
+                    module["offset"], = LONG.unpack(value)
+                elif record_id == MODULETYPE_PROCEDURAL and module:
+                    module["procedural"] = True
+                elif record_id == MODULETERMINATOR and module:
+                    self.modules.append(Module(**module))
+                    module = {}
+            except (UnpackError, UnicodeDecodeError, LookupError):
+                self._error("Record 0x%04x of dir stream is malformed." %
+                            record_id)
+
+    def __getitem__(self, name):
+        """ Module by its name """
+        for module in self.modules:
+            if module.name == name:
+                return module
+        raise KeyError(name)
+
+    def __len__(self):
+        return len(self.modules)
+
+    def chunks(self, name, chunk_size=2 ** 16):
+        """
+        Generates decompressed source of module `name` (raw bytes). Module
+        stream is read from source offset by blocks of `chunk_size` bytes.
+        """
+        module = self[name]
+        entry = self.source.directory.by_path(self.path + "/" + module.stream)
+        return iter_decompress(entry.chunks(chunk_size, module.offset))
+
+    def code(self, name, chunk_size=2 ** 16):
+        """ Generates decoded source of module `name` by parts """
+        decoder = getincrementaldecoder(self.codec)("replace")
+        for data in self.chunks(name, chunk_size):
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b'', True)
+        if text:
+            yield text
+
+    def read(self, name):
+        """ Whole decoded source of module `name` """
+        return ''.join(self.code(name))
+
+    def __repr__(self):
+        return '<%s "%s" of %r>' % (self.__class__.__name__, self.path,
+                                    self.source)
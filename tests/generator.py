@@ -0,0 +1,411 @@
+""" Deterministic generator of synthetic Compound File Binary files """
+from hashlib import sha256
+from os import close, remove
+from random import Random
+from struct import pack
+from tempfile import mkstemp
+
+from cfb.constants import DIFSECT, ENDOFCHAIN, FATSECT, FREESECT, \
+    NOSTREAM, STORAGE, STREAM, ROOT
+
+__all__ = ['SyntheticCfb', 'compress', 'temporary_file', 'vba_project']
+
+SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+CUTOFF_SIZE = 0x00001000
+MINI_SECTOR_SIZE = 64
+STORAGE_TIME = 130000000000000000
+
+
+def ceil_div(a, b):
+    """ Integer division rounded up """
+    return -(-a // b)
+
+
+def temporary_file(test_case=None, suffix=".cfb"):
+    """
+    Creates empty temporary file and returns its name, its descriptor is
+    closed at once. File is removed after `test_case`, if it's given.
+    """
+    descriptor, filename = mkstemp(suffix=suffix)
+    close(descriptor)
+    if test_case is not None:
+        test_case.addCleanup(remove_file, filename)
+    return filename
+
+
+def remove_file(filename):
+    """ Removes file, if test hasn't removed it already """
+    try:
+        remove(filename)
+    except OSError:
+        pass
+
+
+def compress_chunk(chunk):
+    """
+    Compresses up to 4096 bytes into MS-OVBA compressed chunk. Matches are
+    searched greedily among few last positions of the same 3 bytes.
+    """
+    body = bytearray()
+    recent = {}
+    position = 0
+
+    def remember(index):
+        """ Adds position to candidates of its 3 bytes """
+        candidates = recent.setdefault(bytes(chunk[index:index + 3]), [])
+        candidates.append(index)
+        del candidates[:-16]
+
+    while position < len(chunk):
+        flags, tokens = 0, bytearray()
+        for bit in range(8):
+            if position >= len(chunk):
+                break
+            bit_count = max((position - 1).bit_length(), 4)
+            maximum = (0xffff >> bit_count) + 3
+            best, offset = 0, 0
+            key = bytes(chunk[position:position + 3])
+            for candidate in reversed(recent.get(key, [])):
+                length = 0
+                while length < maximum and position + length < len(chunk) \
+                        and chunk[candidate + length] == \
+                        chunk[position + length]:
+                    length += 1
+                if length > best:
+                    best, offset = length, position - candidate
+
+            if best >= 3:
+                tokens += pack("<H", (offset - 1) << (16 - bit_count) |
+                               (best - 3))
+                flags |= 1 << bit
+                for index in range(position, position + best):
+                    remember(index)
+                position += best
+            else:
+                tokens.append(chunk[position])
+                remember(position)
+                position += 1
+        body.append(flags)
+        body += tokens
+
+    if len(body) >= 4096 and len(chunk) == 4096:
+        return pack("<H", 0x3fff) + bytes(chunk)
+    return pack("<H", 0xb000 | (len(body) - 1)) + bytes(body)
+
+
+def compress(data):
+    """ Compresses `data` into MS-OVBA compressed container """
+    data = bytearray(data)
+    return b"\x01" + b"".join(compress_chunk(data[i:i + 4096])
+                              for i in range(0, len(data), 4096))
+
+
+def vba_project(modules, codepage=1252, cache=b"\xcc" * 37):
+    """
+    Returns `files` of VBA project storage with `modules` dictionary of
+    names and source code. Module streams start with fake performance
+    `cache`, so source is stored at non-zero offset, like in real files.
+    """
+    def record(record_id, data):
+        """ Single dir stream record """
+        return pack("<HL", record_id, len(data)) + data
+
+    information = record(0x0001, pack("<L", 1)) + \
+        record(0x0002, pack("<L", 0x409)) + \
+        record(0x0003, pack("<H", codepage)) + \
+        record(0x0004, b"Project") + \
+        pack("<HLLH", 0x0009, 4, 1, 0)
+    result = {}
+    parts = [information, record(0x000f, pack("<H", len(modules))),
+             record(0x0013, pack("<H", 0xffff))]
+    for name, code in sorted(modules.items()):
+        encoded = name.encode("ascii")
+        parts += [record(0x0019, encoded),
+                  record(0x0047, name.encode("utf-16-le")),
+                  record(0x001a, encoded),
+                  record(0x0032, name.encode("utf-16-le")),
+                  record(0x0031, pack("<L", len(cache))),
+                  record(0x002c, pack("<H", 0xffff)),
+                  record(0x0021, b""),
+                  record(0x002b, b"")]
+        result["VBA/" + name] = cache + compress(code.encode(
+            "cp%d" % codepage))
+    parts.append(record(0x0010, b""))
+    result["VBA/dir"] = compress(b"".join(parts))
+    return result
+
+
+class SyntheticCfb(object):
+    """
+    Builds compound files with predictable content. Every parameter
+    (version, amount and size of streams, sectors fragmentation and DIFAT
+    depth) is explicit, so same arguments always produce the same file.
+    Streams smaller than cutoff size are stored in mini stream, like real
+    writers do. Streams with explicit content could be added by `files`
+    dictionary of paths and data.
+    """
+    # pylint: disable=R0902, R0913
+    def __init__(self, version=3, streams=4, stream_size=8192,
+                 mini_streams=0, mini_size=100, storages=0,
+                 fragmentation=0.0, difat_sectors=0, seed=0, files=None):
+        if version not in (3, 4):
+            raise ValueError("Only version 3 and 4 files are supported")
+        if not 0.0 <= fragmentation <= 1.0:
+            raise ValueError("Fragmentation must be in [0.0, 1.0] range")
+
+        self.version = version
+        self.sector_size = 512 if version == 3 else 4096
+        self.fragmentation = fragmentation
+        self.difat_sectors = difat_sectors
+        self.seed = seed
+
+        self.storages = ["Storage%02d" % i for i in range(storages)]
+        self.sizes = {}
+        self.paths = []
+
+        names = [("Stream%04d" % i, stream_size) for i in range(streams)]
+        names += [("Mini%04d" % i, mini_size) for i in range(mini_streams)]
+        for i, (name, size) in enumerate(names):
+            if self.storages:
+                name = "%s/%s" % (self.storages[i % storages], name)
+            self.paths.append(name)
+            self.sizes[name] = size
+
+        self.files = dict(files or {})
+        for path, content in sorted(self.files.items()):
+            parent = path.rpartition("/")[0]
+            if "/" in parent:
+                raise ValueError("Only one level of storages is supported")
+            if parent and parent not in self.storages:
+                self.storages.append(parent)
+            self.paths.append(path)
+            self.sizes[path] = len(content)
+
+    @staticmethod
+    def payload(path, size):
+        """
+        Content of stream stored by `path`. It's a repeated digest of the
+        path, so every stream differs from others, but costs nothing.
+        """
+        digest = sha256(path.encode("utf-8")).digest()
+        return (digest * (size // len(digest) + 1))[:size]
+
+    def data(self, path):
+        """ Returns expected content of stream stored by `path` """
+        if path in self.files:
+            return self.files[path]
+        return self.payload(path, self.sizes[path])
+
+    def _tree(self):
+        """
+        Returns list of directory entries as dictionaries. Siblings are
+        organized in balanced binary search trees ordered by name length
+        and then by uppercased name.
+        """
+        entries = [dict(name="Root Entry", type=ROOT, children=[])]
+        storages = {}
+        for name in self.storages:
+            storages[name] = len(entries)
+            entries[0]["children"].append(len(entries))
+            entries.append(dict(name=name, type=STORAGE, children=[]))
+
+        for path in self.paths:
+            parent, _, name = path.rpartition("/")
+            parent = storages[parent] if parent else 0
+            entries[parent]["children"].append(len(entries))
+            entries.append(dict(name=name, type=STREAM, path=path,
+                                size=self.sizes[path]))
+
+        for entry in entries:
+            entry.update(left=NOSTREAM, right=NOSTREAM, child=NOSTREAM)
+
+        def balance(ids):
+            """ Organizes siblings, returns id of subtree's top """
+            if not ids:
+                return NOSTREAM
+            middle = len(ids) // 2
+            top = ids[middle]
+            entries[top]["left"] = balance(ids[:middle])
+            entries[top]["right"] = balance(ids[middle + 1:])
+            return top
+
+        for entry in entries:
+            if "children" in entry:
+                entry["child"] = balance(sorted(
+                    entry["children"],
+                    key=lambda i: (len(entries[i]["name"]),
+                                   entries[i]["name"].upper())))
+
+        return entries
+
+    def _layout(self, entries):
+        """
+        Allocates sectors: FAT, DIFAT, directory, mini-FAT, mini stream
+        and then data sectors of normal streams, which are shuffled by
+        `fragmentation` factor.
+        """
+        per_sector = self.sector_size // 4
+
+        mini_sectors = 0
+        units = []
+        for entry_id, entry in enumerate(entries):
+            if entry["type"] != STREAM or not entry["size"]:
+                continue
+            if entry["size"] < CUTOFF_SIZE:
+                entry["start"] = mini_sectors
+                mini_sectors += ceil_div(entry["size"], MINI_SECTOR_SIZE)
+            else:
+                count = ceil_div(entry["size"], self.sector_size)
+                units.extend((entry_id, i) for i in range(count))
+
+        layout = dict(
+            directory=ceil_div(len(entries) * 128, self.sector_size),
+            minifat=ceil_div(mini_sectors * 4, self.sector_size),
+            ministream=ceil_div(mini_sectors * MINI_SECTOR_SIZE,
+                                self.sector_size),
+            mini_sectors=mini_sectors)
+        content = len(units) + layout["directory"] + layout["minifat"] + \
+            layout["ministream"]
+
+        fat = 1
+        if self.difat_sectors:
+            fat = 109 + (self.difat_sectors - 1) * (per_sector - 1) + 1
+        while True:
+            difat = ceil_div(max(fat - 109, 0), per_sector - 1)
+            if fat * per_sector >= content + fat + difat:
+                break
+            fat += 1
+
+        layout.update(fat=fat, difat=difat)
+        layout["difat_start"] = fat
+        layout["directory_start"] = layout["difat_start"] + difat
+        layout["minifat_start"] = \
+            layout["directory_start"] + layout["directory"]
+        layout["ministream_start"] = \
+            layout["minifat_start"] + layout["minifat"]
+        base = layout["ministream_start"] + layout["ministream"]
+
+        placement = list(units)
+        random = Random(self.seed)
+        for _ in range(int(self.fragmentation * len(placement))):
+            i = random.randrange(len(placement))
+            j = random.randrange(len(placement))
+            placement[i], placement[j] = placement[j], placement[i]
+
+        chains = {}
+        for sector, unit in enumerate(placement, base):
+            chains.setdefault(unit[0], {})[unit[1]] = sector
+        for entry_id, sectors in chains.items():
+            chain = [sectors[i] for i in range(len(sectors))]
+            entries[entry_id]["chain"] = chain
+            entries[entry_id]["start"] = chain[0]
+
+        layout["total"] = base + len(placement)
+        return layout
+
+    def build(self):
+        """ Returns whole synthetic file as bytes """
+        # pylint: disable=R0914
+        sector_size = self.sector_size
+        per_sector = sector_size // 4
+        entries = self._tree()
+        layout = self._layout(entries)
+        output = bytearray(sector_size * (layout["total"] + 1))
+
+        def offset(sector):
+            """ Seekable position of sector """
+            return (sector + 1) * sector_size
+
+        def run(start, count):
+            """ Contiguous sectors chain """
+            return list(range(start, start + count))
+
+        fat = [FREESECT] * (layout["fat"] * per_sector)
+        fat[:layout["fat"]] = [FATSECT] * layout["fat"]
+        fat[layout["difat_start"]:layout["directory_start"]] = \
+            [DIFSECT] * layout["difat"]
+        chains = [run(layout["directory_start"], layout["directory"]),
+                  run(layout["minifat_start"], layout["minifat"]),
+                  run(layout["ministream_start"], layout["ministream"])]
+        chains += [entry["chain"] for entry in entries if "chain" in entry]
+        for chain in chains:
+            for current, following in zip(chain, chain[1:] + [ENDOFCHAIN]):
+                fat[current] = following
+        output[offset(0):offset(layout["fat"])] = \
+            pack("<%dL" % len(fat), *fat)
+
+        fat_sectors = list(range(layout["fat"]))
+        difat = (fat_sectors[:109] + [FREESECT] * 109)[:109]
+        for i in range(layout["difat"]):
+            part = fat_sectors[109 + i * (per_sector - 1):
+                               109 + (i + 1) * (per_sector - 1)]
+            part += [FREESECT] * (per_sector - 1 - len(part))
+            part.append(layout["difat_start"] + i + 1
+                        if i + 1 < layout["difat"] else ENDOFCHAIN)
+            position = offset(layout["difat_start"] + i)
+            output[position:position + sector_size] = \
+                pack("<%dL" % per_sector, *part)
+
+        minifat = []
+        ministream = offset(layout["ministream_start"])
+        for entry in entries:
+            if entry["type"] != STREAM or not entry["size"]:
+                entry.setdefault(
+                    "start", ENDOFCHAIN if entry["type"] == STREAM else 0)
+                continue
+            data = self.data(entry["path"])
+            if "chain" not in entry:
+                count = ceil_div(entry["size"], MINI_SECTOR_SIZE)
+                minifat.extend(run(entry["start"] + 1, count - 1))
+                minifat.append(ENDOFCHAIN)
+                position = ministream + entry["start"] * MINI_SECTOR_SIZE
+                output[position:position + len(data)] = data
+                continue
+            for i, sector in enumerate(entry["chain"]):
+                part = data[i * sector_size:(i + 1) * sector_size]
+                output[offset(sector):offset(sector) + len(part)] = part
+        if minifat:
+            minifat += [FREESECT] * (layout["minifat"] * per_sector -
+                                     len(minifat))
+            position = offset(layout["minifat_start"])
+            output[position:position + len(minifat) * 4] = \
+                pack("<%dL" % len(minifat), *minifat)
+
+        root = entries[0]
+        root["size"] = layout["mini_sectors"] * MINI_SECTOR_SIZE
+        root["start"] = layout["ministream_start"] \
+            if layout["mini_sectors"] else ENDOFCHAIN
+        position = offset(layout["directory_start"])
+        for entry in entries:
+            name = (entry["name"] + "\0").encode("utf-16-le")
+            stamp = STORAGE_TIME + self.seed \
+                if entry["type"] == STORAGE else 0
+            output[position:position + 128] = pack(
+                "<64sHBBLLL16sLQQLQ", name, len(name), entry["type"], 1,
+                entry["left"], entry["right"], entry["child"], b"\0" * 16,
+                0, stamp, stamp, entry["start"], entry.get("size", 0))
+            position += 128
+        unused = pack("<64sHBBLLL16sLQQLQ", b"", 0, 0, 0, NOSTREAM,
+                      NOSTREAM, NOSTREAM, b"\0" * 16, 0, 0, 0, 0, 0)
+        while position < offset(layout["directory_start"] +
+                                layout["directory"]):
+            output[position:position + 128] = unused
+            position += 128
+
+        output[:512] = pack(
+            "<8s16sHHHHH6sLLLLLLLLL109L", SIGNATURE, b"\0" * 16, 0x003e,
+            self.version, 0xfffe, 9 if self.version == 3 else 12, 6,
+            b"\0" * 6, layout["directory"] if self.version == 4 else 0,
+            layout["fat"], layout["directory_start"], 0, CUTOFF_SIZE,
+            layout["minifat_start"] if layout["minifat"] else ENDOFCHAIN,
+            layout["minifat"],
+            layout["difat_start"] if layout["difat"] else ENDOFCHAIN,
+            layout["difat"], *difat)
+
+        return bytes(output)
+
+    def save(self, filename):
+        """ Writes synthetic file to `filename` and returns its name """
+        with open(filename, "wb") as output:
+            output.write(self.build())
+        return filename
@@ -0,0 +1,68 @@
+from os import listdir, utime
+from os.path import join
+from shutil import copyfile, rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO
+from cfb.cache import IndexCache
+
+
+class IndexCacheTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+        self.directory = mkdtemp()
+        self.filename = join(self.directory, "simple.doc")
+        copyfile("tests/data/simple.doc", self.filename)
+        self.me = IndexCache(mkdtemp(dir=self.directory))
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def test_main(self):
+        original = CfbIO(self.filename, index_cache=self.me)
+        self.assertEqual((self.me.hits, self.me.misses), (0, 1))
+        self.assertEqual(len(listdir(self.me.directory)), 1)
+
+        cached = CfbIO(self.filename, index_cache=self.me)
+        self.assertEqual((self.me.hits, self.me.misses), (1, 1))
+
+        self.assertEqual(list(cached.fat), list(original.fat))
+        self.assertEqual(list(cached.minifat), list(original.minifat))
+        self.assertEqual(cached.difat, original.difat)
+        self.assertEqual(cached.directory.paths, original.directory.paths)
+        self.assertEqual(len(cached.directory), 1)
+
+        for path in original.directory.paths:
+            me = cached.directory.by_path(path)
+            self.assertEqual(me.name, original.directory.by_path(path).name)
+            self.assertEqual(me.read(),
+                             original.directory.by_path(path).read())
+        self.assertEqual(cached["1Table"].read(), original["1Table"].read())
+
+    def test_directory_name(self):
+        CfbIO(self.filename, index_cache=self.me.directory)
+        CfbIO(self.filename, index_cache=self.me)
+        self.assertEqual(self.me.hits, 1)
+
+    def test_invalidation(self):
+        CfbIO(self.filename, index_cache=self.me)
+        utime(self.filename, (0, 0))
+        CfbIO(self.filename, index_cache=self.me)
+        self.assertEqual((self.me.hits, self.me.misses), (0, 2))
+
+        index = join(self.me.directory, listdir(self.me.directory)[0])
+        with open(index, "r+b") as output:
+            output.seek(100)
+            output.truncate()
+        CfbIO(self.filename, index_cache=self.me)
+        self.assertEqual((self.me.hits, self.me.misses), (0, 3))
+        CfbIO(self.filename, index_cache=self.me)
+        self.assertEqual((self.me.hits, self.me.misses), (1, 3))
+
+    def test_read_only(self):
+        me = IndexCache(join(self.directory, "missing"))
+        io = CfbIO(self.filename, index_cache=me)
+        self.assertEqual(me.misses, 1)
+        self.assertFalse(me.save(io))
@@ -0,0 +1,118 @@
+import gc
+from os import listdir
+from os.path import isdir
+from shutil import copyfile
+from struct import pack
+from tracemalloc import get_traced_memory, start, stop
+from unittest import TestCase, skipUnless
+from warnings import simplefilter
+from weakref import ref
+
+from cfb import CfbIO
+from cfb.constants import DIFSECT, ENDOFCHAIN, FATSECT
+from cfb.exceptions import ErrorDefect, FatalDefect
+from tests.generator import SyntheticCfb, temporary_file
+
+
+class CfbIOTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+
+    def test_tables(self):
+        me = CfbIO(self.filename)
+
+        self.assertEqual(me.difat, [0])
+        self.assertEqual(len(me.fat), 128)
+        self.assertEqual(me.fat[0], FATSECT)
+        self.assertEqual(me.next_fat(0), me.fat[0])
+        self.assertEqual(len(me.minifat), 128)
+        self.assertEqual(me.next_minifat(128), ENDOFCHAIN)
+        self.assertRaises(ErrorDefect, me.next_fat, 128)
+
+    def test_chain(self):
+        me = CfbIO(self.filename)
+
+        self.assertEqual(me.chain(me.header.directory_sector_start),
+                         [15, 16])
+        self.assertEqual(me.chain(ENDOFCHAIN), [])
+        self.assertEqual(len(me.chain(me["1Table"].sector_start, True)),
+                         me["1Table"].size // 64 + 1)
+
+    def test_difat(self):
+        filename = temporary_file(self)
+        generator = SyntheticCfb(difat_sectors=3)
+        me = CfbIO(generator.save(filename))
+
+        self.assertEqual(me.difat, list(range(109 + 127 * 2 + 1)))
+        self.assertEqual(len(me.fat), len(me.difat) * 128)
+        self.assertEqual([me.fat[i] for i in range(364, 367)],
+                         [DIFSECT] * 3)
+        self.assertEqual(me["Stream0000"].read(),
+                         generator.data("Stream0000"))
+        me.close()
+
+    def test_difat_cyclic(self):
+        filename = temporary_file(self)
+        copyfile(self.filename, filename)
+        with open(filename, "r+b") as output:
+            # Huge FAT, DIFAT of any length, which only sector points to
+            # itself
+            output.seek(0x2c)
+            output.write(pack("<L", 0xffffffff))
+            output.seek(0x44)
+            output.write(pack("<LL", 17, 0xffffffff))
+            output.seek(18 << 9)
+            output.write(pack("<128L", *([0xffffffff] * 127 + [17])))
+
+        self.assertRaises(ErrorDefect, CfbIO, filename)
+        with CfbIO(filename, raise_if=FatalDefect) as me:
+            self.assertEqual(me.difat, [0])
+            self.assertEqual(len(me["WordDocument"].read()), 3620)
+
+    def test_context_manager(self):
+        with CfbIO(self.filename) as me:
+            self.assertEqual(len(me["1Table"].read()), 1681)
+        self.assertEqual(me.closed, True)
+
+    def test_no_cycles(self):
+        # Without cycles file is freed (and closed) by reference counting
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for options in ({}, {"lazy": True}, {"stats": True}):
+                me = CfbIO(self.filename, **options)
+                me["1Table"].read()
+                me.digests()
+                reference = ref(me)
+                del me
+                self.assertEqual(reference(), None)
+        finally:
+            if enabled:
+                gc.enable()
+
+    @skipUnless(isdir("/proc/self/fd"), "needs /proc/self/fd")
+    def test_open_and_drop(self):
+        def open_and_drop(count):
+            for _ in range(count):
+                me = CfbIO(self.filename, lazy=True)
+                me["WordDocument"].read(16)
+
+        enabled = gc.isenabled()
+        gc.disable()
+        start()
+        try:
+            open_and_drop(100)
+            descriptors = len(listdir("/proc/self/fd"))
+            memory = get_traced_memory()[0]
+
+            open_and_drop(2000)
+            self.assertEqual(len(listdir("/proc/self/fd")), descriptors)
+            # Only Python allocations are traced, not resident set size,
+            # which is too noisy here: Lifecycle benchmark tracks it
+            self.assertTrue(get_traced_memory()[0] - memory < 2 ** 16)
+        finally:
+            stop()
+            if enabled:
+                gc.enable()
@@ -0,0 +1,150 @@
+from contextlib import redirect_stdout
+from io import BytesIO, StringIO, TextIOWrapper
+from json import loads
+from os import listdir, symlink
+from os.path import exists, join
+from shutil import copy, rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+from unittest.mock import patch
+from warnings import simplefilter
+
+from cfb import CfbIO, probe
+from cfb.cli import main, safe_name
+from tests.generator import SyntheticCfb
+
+
+class CliTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+        self.directory = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def run_main(self, *argv):
+        output = StringIO()
+        with redirect_stdout(output):
+            status = main(list(argv))
+        return status, [loads(line) for line in output.getvalue().split("\n")
+                        if line]
+
+    def test_ls(self):
+        status, records = self.run_main("ls", self.filename)
+
+        self.assertEqual(status, 0)
+        self.assertEqual([record["path"] for record in records],
+                         ["\x01CompObj", "\x01Ole",
+                          "\x05DocumentSummaryInformation",
+                          "\x05SummaryInformation", "1Table",
+                          "WordDocument"])
+        self.assertEqual(records[-1], dict(file=self.filename, size=3620,
+                                           path="WordDocument",
+                                           type="stream"))
+
+    def test_stat(self):
+        status, records = self.run_main("stat", self.filename, "setup.py")
+
+        self.assertEqual(status, 1)
+        self.assertEqual(records[0]["version"], "3.59")
+        self.assertEqual(records[0]["streams"], 6)
+        self.assertEqual(records[0]["bytes"], 5715)
+        self.assertEqual(records[1], dict(file="setup.py",
+                                          error="Not a compound file"))
+
+    def test_extract(self):
+        status, records = self.run_main("extract", "-o", self.directory,
+                                        "-p", "WordDocument", self.filename)
+        self.assertEqual(status, 0)
+        self.assertEqual(len(records), 1)
+
+        with open(records[0]["output"], "rb") as extracted, \
+                CfbIO(self.filename) as opened:
+            self.assertEqual(extracted.read(),
+                             opened.directory.by_path("WordDocument").read())
+        self.assertEqual(listdir(join(self.directory, "simple.doc")),
+                         ["WordDocument"])
+        self.assertEqual(safe_name("\x05Summary/a:b"), "_05Summary_2fa_3ab")
+        self.assertEqual(safe_name(".."), "_2e_2e")
+        self.assertEqual(safe_name("..a"), "..a")
+
+    def test_extract_dot_names(self):
+        filename = SyntheticCfb(streams=0, files={
+            "+a": b"inside", "../evil": b"outside", "./here": b"dot"}).save(
+                join(self.directory, "dots.cfb"))
+        output = join(self.directory, "out")
+        status, records = self.run_main("extract", "-o", output, filename)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(listdir(self.directory)), ["dots.cfb", "out"])
+        self.assertEqual(listdir(output), ["dots.cfb"])
+        self.assertEqual(sorted(listdir(join(output, "dots.cfb"))),
+                         ["+a", "_2e", "_2e_2e"])
+        with open(join(output, "dots.cfb", "_2e_2e", "evil"), "rb") as data:
+            self.assertEqual(data.read(), b"outside")
+
+        # Symbolic links inside output directory aren't followed outside
+        rmtree(join(output, "dots.cfb", "_2e_2e"))
+        symlink(self.directory, join(output, "dots.cfb", "_2e_2e"))
+        status, records = self.run_main("extract", "-o", output, filename)
+        self.assertEqual(status, 1)
+        self.assertTrue("outside" in records[-1]["error"])
+        self.assertFalse(exists(join(self.directory, "evil")))
+
+    def test_verify(self):
+        status, records = self.run_main("verify", self.filename, "setup.py")
+
+        self.assertEqual(status, 1)
+        self.assertEqual(records[0]["ok"], True)
+        self.assertEqual(records[0]["streams"], 6)
+        self.assertEqual(records[0]["errors"], [])
+        self.assertEqual(records[1]["ok"], False)
+        self.assertEqual(records[1]["streams"], None)
+
+    def test_directories(self):
+        for name in ("a.doc", "b.doc"):
+            copy(self.filename, join(self.directory, name))
+        copy("setup.py", self.directory)
+
+        status, records = self.run_main("stat", "-j", "2", self.directory)
+        self.assertEqual(status, 0)
+        self.assertEqual([record["file"] for record in records],
+                         [join(self.directory, "a.doc"),
+                          join(self.directory, "b.doc")])
+
+    def test_malformed(self):
+        for name in ("a.doc", "bad.doc"):
+            copy(self.filename, join(self.directory, name))
+
+        def hostile(filename):
+            if filename.endswith("bad.doc"):
+                raise OverflowError("hostile header")
+            return probe(filename)
+
+        with patch("cfb.cli.probe", hostile):
+            # Directory listing skips file, which can't be probed
+            status, records = self.run_main("ls", self.directory)
+            self.assertEqual(status, 0)
+            self.assertEqual(set(record["file"] for record in records),
+                             set([join(self.directory, "a.doc")]))
+
+            # Any error is reported as record of failed file only
+            status, records = self.run_main(
+                "stat", join(self.directory, "bad.doc"),
+                join(self.directory, "a.doc"))
+            self.assertEqual(status, 1)
+            self.assertEqual(records[0], dict(
+                file=join(self.directory, "bad.doc"),
+                error="hostile header"))
+            self.assertEqual(records[1]["streams"], 6)
+
+    def test_cat(self):
+        output = TextIOWrapper(BytesIO())
+        with redirect_stdout(output):
+            self.assertEqual(main(["cat", self.filename, "1Table"]), 0)
+
+        with CfbIO(self.filename) as opened:
+            self.assertEqual(output.buffer.getvalue(),
+                             opened.directory.by_path("1Table").read())
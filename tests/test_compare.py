@@ -0,0 +1,63 @@
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO, diff
+from cfb.compare import Change
+from tests.generator import SyntheticCfb, temporary_file
+
+
+class DiffTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+
+    def open(self, data):
+        filename = temporary_file(self)
+        with open(filename, "wb") as output:
+            output.write(data)
+        return CfbIO(filename, stats=True)
+
+    def test_same(self):
+        a = CfbIO("tests/data/simple.doc")
+        b = CfbIO("tests/data/simple.doc")
+
+        self.assertEqual(diff(a, a), [])
+        self.assertEqual(diff(a, b), [])
+
+    def test_data(self):
+        generator = SyntheticCfb(streams=3, stream_size=50000,
+                                 mini_streams=2, fragmentation=0.5)
+        data = bytearray(generator.build())
+        a = self.open(bytes(data))
+
+        changed = {"Stream0001": 40000, "Mini0001": 7}
+        for path, offset in changed.items():
+            entry = a.directory.by_path(path)
+            for position, length in entry.extents:
+                if offset < length:
+                    data[position + offset] ^= 0xff
+                    break
+                offset -= length
+        b = self.open(bytes(data))
+
+        reads = a.stats.bytes_read
+        self.assertEqual(diff(a, b, chunk_size=4096), [
+            Change("Mini0001", "data", 7),
+            Change("Stream0001", "data", 40000)])
+        # Stream0001 is read only till first different block
+        self.assertTrue(a.stats.bytes_read - reads < 2 * 50000 + 45056)
+
+    def test_structure(self):
+        a = self.open(SyntheticCfb(streams=3, storages=2).build())
+        b = self.open(SyntheticCfb(streams=4, storages=2,
+                                   stream_size=4096).build())
+
+        reads = a.stats.bytes_read
+        self.assertEqual(diff(a, b), [
+            Change("Storage00/Stream0000", "size", None),
+            Change("Storage00/Stream0002", "size", None),
+            Change("Storage01/Stream0001", "size", None),
+            Change("Storage01/Stream0003", "added", None)])
+        self.assertEqual(diff(b, a)[-1],
+                         Change("Storage01/Stream0003", "removed", None))
+        # Resized streams are not read at all
+        self.assertEqual(a.stats.bytes_read, reads)
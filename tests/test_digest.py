@@ -0,0 +1,83 @@
+from hashlib import md5, sha256
+from os import utime
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO
+from cfb.digest import CorpusHasher
+from tests.generator import SyntheticCfb, temporary_file
+
+
+class DigestTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+
+    def test_entry(self):
+        io = CfbIO(self.filename)
+
+        for _, me in io.streams():
+            data = me.read()
+            self.assertEqual(sum(length for _, length in me.extents),
+                             me.size)
+            self.assertEqual(b"".join(me.chunks(100)), data)
+            self.assertEqual(me.digest(), sha256(data).hexdigest())
+            self.assertEqual(me.digest("md5", 7), md5(data).hexdigest())
+
+        self.assertEqual(io["WordDocument"].extents, [(4160, 3620)])
+        self.assertEqual(io["1Table"].extents, [(2240, 1681)])
+
+    def test_digests(self):
+        io = CfbIO(self.filename)
+        me = io.digests()
+        data = io["1Table"].read()
+
+        self.assertEqual(sorted(me), ["\x01CompObj", "\x01Ole", "\x05Doc"
+                                      "umentSummaryInformation",
+                                      "\x05SummaryInformation", "1Table",
+                                      "WordDocument"])
+        self.assertEqual(me["1Table"], sha256(data).hexdigest())
+        self.assertEqual(io.digests(workers=4), me)
+        self.assertEqual(io.digests("md5", paths=["1Table"]),
+                         {"1Table": md5(data).hexdigest()})
+
+    def test_fragmented(self):
+        generator = SyntheticCfb(streams=4, stream_size=50000,
+                                 mini_streams=30, mini_size=1000,
+                                 fragmentation=1.0)
+        filename = generator.save(temporary_file(self))
+        io = CfbIO(filename)
+        fragmented = 0
+        for path in generator.paths:
+            me = io.directory.by_path(path)
+            fragmented += len(me.extents) > 1
+            self.assertEqual(b"".join(me.chunks()), generator.data(path))
+        self.assertTrue(fragmented > 0)
+        io.close()
+
+
+class CorpusHasherTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+        self.generator = SyntheticCfb(streams=3, mini_streams=3)
+        self.filename = self.generator.save(temporary_file(self))
+
+    def test_main(self):
+        me = CorpusHasher(workers=2)
+
+        first = me.digests(CfbIO(self.filename))
+        self.assertEqual((me.hashed, me.skipped), (6, 0))
+        self.assertEqual(first["Mini0001"], sha256(
+            self.generator.data("Mini0001")).hexdigest())
+
+        self.assertEqual(me.digests(CfbIO(self.filename)), first)
+        self.assertEqual((me.hashed, me.skipped), (6, 6))
+
+        utime(self.filename, (0, 0))
+        self.assertEqual(me.digests(CfbIO(self.filename)), first)
+        self.assertEqual((me.hashed, me.skipped), (12, 6))
+
+        again = CorpusHasher(known=me.known)
+        again.digests(CfbIO(self.filename))
+        self.assertEqual((again.hashed, again.skipped), (0, 6))
@@ -1,9 +1,8 @@
-# coding=utf-8
-from __future__ import unicode_literals
 from unittest import TestCase
 from warnings import simplefilter
 
 from cfb import CfbIO
+from tests.generator import SyntheticCfb, temporary_file
 
 
 class DirectoryTestCase(TestCase):
@@ -42,3 +41,30 @@ class DirectoryTestCase(TestCase):
         self.assertRaises(TypeError, me.__getitem__, "Foo")
         self.assertRaises(TypeError, me.by_name, 10)
         self.assertRaises(KeyError, me.by_name, 'Здравствуй, мир!')
+
+    def test_paths(self):
+        owner = CfbIO(self.filename)
+        me = owner.directory
+
+        self.assertEqual(sorted(me.paths.values()), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(me.by_path("1Table"), me.by_name("1Table"))
+        self.assertEqual(me.by_path("Root Entry"), me[0])
+        self.assertRaises(KeyError, me.by_path, "1Table/Foo")
+
+        # Directory doesn't keep its file alive
+        del owner
+        self.assertRaises(ValueError, me.by_path, "1Table")
+
+    def test_storages(self):
+        generator = SyntheticCfb(streams=2, mini_streams=2, storages=2)
+        filename = generator.save(temporary_file(self))
+        owner = CfbIO(filename)
+        me = owner.directory
+
+        self.assertEqual(len(me), 7)
+        self.assertEqual(sorted(me.paths), sorted(
+            generator.paths + ["Storage00", "Storage01"]))
+        for path in generator.paths:
+            self.assertEqual(me.by_path(path).read(),
+                             generator.data(path))
+        owner.close()
@@ -1,5 +1,6 @@
 from collections import namedtuple
-from six import BytesIO, b
+from io import BytesIO
+from random import Random
 from unittest import TestCase
 from warnings import simplefilter
 
@@ -8,11 +9,12 @@ from cfb.constants import ENDOFCHAIN
 from cfb.directory.entry import Entry, SEEK_CUR, SEEK_END
 from cfb.exceptions import MaybeDefected, WarningDefect, FatalDefect, \
     ErrorDefect
+from tests.generator import SyntheticCfb, temporary_file
 
 
 class MockCfbIO(BytesIO, MaybeDefected):
     def __init__(self, value, raise_if=WarningDefect):
-        value = b(value)
+        value = value.encode('latin-1')
 
         super(MockCfbIO, self).__init__(value)
         MaybeDefected.__init__(self, raise_if=raise_if)
@@ -30,7 +32,7 @@ class MockCfbIO(BytesIO, MaybeDefected):
         self.current = value
 
     def replace(self, start, replacement):
-        replacement = b(replacement)
+        replacement = replacement.encode('latin-1')
         position = self.tell()
         self.current = self.current[:start] + replacement + \
                        self.current[start + len(replacement):]
@@ -131,6 +133,24 @@ class EntryTestCase(TestCase):
         self.assertEqual(another.left, io[2])
         self.assertEqual(another.right, io["\005SummaryInformation"])
 
+    def test_close(self):
+        io = CfbIO(self.filename)
+        with io["1Table"] as me:
+            self.assertEqual(me.closed, False)
+            self.assertEqual(len(me.read(10)), 10)
+
+        self.assertEqual(me.closed, True)
+        self.assertRaises(ValueError, me.read)
+        self.assertEqual(io.closed, False)
+        self.assertEqual(repr(me), '<Entry[3] "1Table" of None>')
+
+        # Entry doesn't keep its file alive
+        another = io["WordDocument"]
+        io.close()
+        del io
+        self.assertEqual(another.closed, True)
+        self.assertRaises(ValueError, another.seek, 0)
+
     def test_root(self):
         io = CfbIO(self.filename)
         me = io[0]
@@ -148,18 +168,68 @@ class EntryTestCase(TestCase):
 
         self.assertEqual(me.tell(), 0)
         self.assertEqual(me.seek(32), 32)
-        self.assertEqual(me.read(23), b('Microsoft Word-Dokument'))
+        self.assertEqual(me.read(23), b'Microsoft Word-Dokument')
         self.assertEqual(me.tell(), 32 + 23)
         self.assertEqual(me.seek(5, SEEK_CUR), 32 + 23 + 5)
-        self.assertEqual(me.read(9), b('MSWordDoc'))
+        self.assertEqual(me.read(9), b'MSWordDoc')
         self.assertEqual(me.seek(27, SEEK_END), 16 * 5 - 1)
-        self.assertEqual(me.read(8), b('Document'))
+        self.assertEqual(me.read(8), b'Document')
 
         self.assertEqual(me.seek(0), 0)
         data = me.read()
         self.assertEqual(me.size, len(data))
-        self.assertTrue(b('Microsoft Word-Dokument') in data)
-        self.assertEqual(data.find(b('Microsoft Word-Dokument')), 32)
+        self.assertTrue(b'Microsoft Word-Dokument' in data)
+        self.assertEqual(data.find(b'Microsoft Word-Dokument'), 32)
 
         self.assertEqual(me.seek(1024), 1024)
-        self.assertEqual(me.read(16), b(''))
+        self.assertEqual(me.read(16), b'')
+
+        # Reads ending on mini sector boundary
+        me = io["1Table"]
+        data = me.read()
+        me.seek(0)
+        self.assertEqual(me.read(1024) + me.read(1024), data)
+        self.assertEqual(me.seek(64), 64)
+        self.assertEqual(me.read(64), data[64:128])
+
+    def test_read_ranges(self):
+        io = CfbIO(self.filename)
+        me = io["WordDocument"]
+        data = me.read()
+        me.seek(100)
+
+        ranges = [(3000, 700), (0, 10), (5, 10), (1024, 0), (4000, 5),
+                  (512, 128)]
+        self.assertEqual(me.read_ranges(ranges),
+                         [data[offset:offset + length]
+                          for offset, length in ranges])
+        self.assertEqual(me.tell(), 100)
+
+        buffers = [bytearray(8), bytearray(8)]
+        self.assertEqual(me.read_ranges([(16, 8), (3616, 8)], buffers), [8, 4])
+        self.assertEqual(buffers, [bytearray(data[16:24]),
+                                   bytearray(data[3616:] + b"\0" * 4)])
+
+        self.assertEqual(me.read_ranges([]), [])
+        self.assertRaises(ValueError, me.read_ranges, [(-1, 5)])
+        self.assertRaises(ValueError, me.read_ranges, [(0, 1)], [])
+
+    def test_read_ranges_fragmented(self):
+        filename = temporary_file(self)
+        generator = SyntheticCfb(streams=3, stream_size=20000,
+                                 fragmentation=1.0)
+        generator.save(filename)
+        io = CfbIO(filename, stats=True)
+        me = io["Stream0001"]
+        data = generator.data("Stream0001")
+
+        random = Random(0)
+        ranges = [(random.randrange(20000), random.randrange(3000))
+                  for _ in range(50)]
+        reads = io.stats.reads
+        self.assertEqual(me.read_ranges(ranges),
+                         [data[offset:offset + length]
+                          for offset, length in ranges])
+        # Every file run is read once at most
+        self.assertTrue(io.stats.reads - reads <= len(me.extents))
+        io.close()
@@ -0,0 +1,111 @@
+from datetime import datetime
+from struct import pack
+from unittest import TestCase, skipUnless
+from warnings import simplefilter
+
+from cfb import CfbIO
+from cfb.constants import STORAGE
+from cfb.export import COLUMNS, columns, to_numpy, arrow_batches, \
+    filetime_to_datetime64
+from cfb.helpers import from_filetime
+from tests.generator import SyntheticCfb, temporary_file
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+        self.filename = SyntheticCfb(streams=3, storages=2, mini_streams=2)\
+            .save(temporary_file(self))
+        self.sources = ["tests/data/simple.doc", self.filename]
+
+    def expected(self):
+        """ Rows built from Entry objects """
+        rows = []
+        for index, name in enumerate(self.sources):
+            with CfbIO(name) as io:
+                for entry_id in sorted(io.directory):
+                    entry = io.directory[entry_id]
+                    rows.append((index, entry.id, entry.name, entry.type,
+                                 entry.size, bytes(entry._clsid),
+                                 entry.modified_time))
+        return rows
+
+    def test_columns(self):
+        me = columns(self.sources)
+
+        self.assertEqual(sorted(me), sorted(COLUMNS))
+        times = [from_filetime(value) if value else None
+                 for value in me["modified_time"]]
+        self.assertEqual(list(zip(me["file"], me["id"], me["name"],
+                                  me["type"], me["size"], me["clsid"],
+                                  times)),
+                         self.expected())
+        self.assertEqual(me["type"].count(STORAGE), 2)
+        self.assertEqual(len(set(me["creation_time"])), 2)
+        self.assertEqual(columns([]), dict((column, []) for column
+                                           in COLUMNS))
+
+        with CfbIO(self.filename) as io:
+            self.assertEqual(columns([io])["size"], me["size"][7:])
+
+    @skipUnless(numpy, "needs numpy")
+    def test_numpy(self):
+        me = to_numpy(self.sources)
+
+        self.assertEqual(me.dtype.names, COLUMNS)
+        self.assertEqual([(int(row["file"]), int(row["id"]), str(row["name"]),
+                           int(row["type"]), int(row["size"]),
+                           bytes(row["clsid"]),
+                           row["modified_time"].astype(datetime))
+                          for row in me],
+                         self.expected())
+        self.assertEqual(to_numpy(self.sources, convert_times=False)
+                         ["modified_time"].dtype, numpy.dtype("<u8"))
+        self.assertEqual(len(to_numpy([])), 0)
+
+    def test_zero_name_length(self):
+        with CfbIO(self.filename) as io:
+            entry_id = io.directory.paths["Storage00/Stream0000"]
+            position = ((io.directory.sectors[entry_id // 4] + 1) << 9) + \
+                entry_id % 4 * 128
+        with open(self.filename, "r+b") as output:
+            output.seek(position + 64)
+            output.write(pack("<H", 0))
+
+        me = columns([self.filename])
+        self.assertEqual(me["name"][me["id"].index(entry_id)], "")
+        if numpy is not None:
+            me = to_numpy([self.filename])
+            self.assertEqual(str(me["name"][me["id"] == entry_id][0]), "")
+
+    @skipUnless(numpy, "needs numpy")
+    def test_times(self):
+        values = [0, 116444736000000000, 130000000000000000]
+        me = filetime_to_datetime64(values)
+
+        self.assertTrue(numpy.isnat(me[0]))
+        self.assertEqual(me[1].astype(datetime), datetime(1970, 1, 1))
+        self.assertEqual(me[2].astype(datetime), from_filetime(values[2]))
+
+    @skipUnless(numpy and pyarrow, "needs numpy and pyarrow")
+    def test_arrow(self):
+        me = list(arrow_batches(self.sources, files_per_batch=1))
+
+        self.assertEqual(len(me), 2)
+        self.assertEqual(me[0].schema.names, list(COLUMNS))
+        self.assertEqual(me[1].column(0).dictionary.to_pylist(),
+                         [self.filename])
+        self.assertEqual(me[0].column(2).to_pylist(),
+                         columns(self.sources[:1])["name"])
+        self.assertEqual(me[0].column(10).null_count, me[0].num_rows)
+        self.assertEqual(me[1].column(10).null_count, me[1].num_rows - 2)
@@ -0,0 +1,57 @@
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO
+from tests.generator import SyntheticCfb, temporary_file
+
+
+class SyntheticCfbTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+        self.filename = temporary_file(self)
+
+    def check(self, generator):
+        io = CfbIO(generator.save(self.filename))
+        for path in generator.paths:
+            me = io[path.rpartition("/")[2]]
+            self.assertEqual(me.size, generator.sizes[path])
+            self.assertEqual(me.read(), generator.data(path))
+        return io
+
+    def test_versions(self):
+        me = self.check(SyntheticCfb(version=3, mini_streams=2))
+        self.assertEqual(me.header.version, (3, 0x3e))
+        self.assertEqual(me.header.sector_size, 512)
+        self.assertEqual(len(me), 7)
+
+        me = self.check(SyntheticCfb(version=4, mini_streams=2))
+        self.assertEqual(me.header.version, (4, 0x3e))
+        self.assertEqual(me.header.sector_size, 4096)
+        self.assertEqual(me.size % 4096, 0)
+
+    def test_fragmentation(self):
+        me = SyntheticCfb(streams=3, stream_size=10000, fragmentation=1.0)
+        self.check(me)
+        self.assertEqual(me.build(), me.build())
+        self.assertNotEqual(me.build(), SyntheticCfb(
+            streams=3, stream_size=10000, fragmentation=1.0, seed=1).build())
+
+    def test_difat(self):
+        me = self.check(SyntheticCfb(difat_sectors=2))
+        self.assertEqual(me.header.difat_sector_count, 2)
+        self.assertEqual(me.header.fat_sectors_count, 109 + 127 + 1)
+
+    def test_storages(self):
+        me = SyntheticCfb(streams=2, mini_streams=2, storages=2)
+        self.assertEqual(me.paths, ["Storage00/Stream0000",
+                                    "Storage01/Stream0001",
+                                    "Storage00/Mini0000",
+                                    "Storage01/Mini0001"])
+
+        io = CfbIO(me.save(self.filename))
+        self.assertEqual(io["Storage00"].child_id, 3)
+        self.assertEqual(io[3].read(), me.data("Storage00/Stream0000"))
+
+    def test_bad_arguments(self):
+        self.assertRaises(ValueError, SyntheticCfb, version=5)
+        self.assertRaises(ValueError, SyntheticCfb, fragmentation=2)
@@ -1,5 +1,5 @@
 from os import SEEK_END, SEEK_SET
-from six import b, BytesIO
+from io import BytesIO
 from unittest import TestCase
 
 from cfb.exceptions import MaybeDefected, ErrorDefect, FatalDefect, \
@@ -9,11 +9,11 @@ from cfb.header import Header
 
 class SourceMock(BytesIO, MaybeDefected):
     def __init__(self, value="", raise_if=ErrorDefect):
-        super(SourceMock, self).__init__(b(value))
+        super(SourceMock, self).__init__(value.encode('latin-1'))
         MaybeDefected.__init__(self, raise_if=raise_if)
 
     def append(self, data):
-        self.write(b(data))
+        self.write(data.encode('latin-1'))
         self.seek(0)
 
         return self
@@ -1,10 +1,11 @@
 from datetime import datetime
 from uuid import UUID
-from six import b, BytesIO
+from io import BytesIO
 from time import time
 from unittest import TestCase
 
-from cfb.helpers import ByteHelpers, Guid, cached, from_filetime
+from cfb.helpers import ByteHelpers, Guid, cached, from_filetime, runs, \
+    slice_extents, merge_ranges, map_ranges
 
 
 class ByteHelpersTestCase(TestCase):
@@ -20,7 +21,7 @@ class ByteHelpersTestCase(TestCase):
         class Foo(BytesIO, ByteHelpers):
             pass
 
-        me = Foo(b('Compound Binary Format'))
+        me = Foo(b'Compound Binary Format')
 
         self.assertEqual(me.get_byte(0), ord('C'))
         self.assertEqual(me.get_short(3), ord('o') * 256 + ord('p'))
@@ -28,6 +29,56 @@ class ByteHelpersTestCase(TestCase):
                          ord('a') * 256 ** 3 + ord('n') * 256 ** 2 +
                          ord('i') * 256 + ord('B'))
 
+        self.assertEqual(list(me.get_longs(9, 2)), [me.get_long(9),
+                                                    me.get_long(13)])
+        self.assertEqual(list(me.get_longs(9, 10)), [me.get_long(9),
+                                                     me.get_long(13),
+                                                     me.get_long(17)])
+        self.assertEqual(me.get_longs(0, 0).itemsize, 4)
+
+
+class RunsTestCase(TestCase):
+    def test_main(self):
+        self.assertEqual(list(runs([])), [])
+        self.assertEqual(list(runs([5])), [(5, 1)])
+        self.assertEqual(list(runs([1, 2, 3, 7, 8, 4, 10])),
+                         [(1, 3), (7, 2), (4, 1), (10, 1)])
+
+
+class SliceExtentsTestCase(TestCase):
+    def test_main(self):
+        extents = [(100, 10), (300, 5), (200, 20)]
+
+        self.assertEqual(slice_extents(extents, 0, 35), extents)
+        self.assertEqual(slice_extents(extents, 0, 100), extents)
+        self.assertEqual(slice_extents(extents, 5, 3), [(105, 3)])
+        self.assertEqual(slice_extents(extents, 8, 10),
+                         [(108, 2), (300, 5), (200, 3)])
+        self.assertEqual(slice_extents(extents, 15, 1), [(200, 1)])
+        self.assertEqual(slice_extents(extents, 35, 1), [])
+        self.assertEqual(slice_extents([], 0, 1), [])
+        self.assertEqual(slice_extents(extents, 8, 10, [0, 10, 15]),
+                         [(108, 2), (300, 5), (200, 3)])
+
+
+class RangesTestCase(TestCase):
+    def test_merge(self):
+        self.assertEqual(merge_ranges([]), [])
+        self.assertEqual(merge_ranges([(10, 5), (0, 3), (3, 2), (12, 10),
+                                       (30, 0), (40, 1)]),
+                         [[0, 5], [10, 22], [40, 41]])
+
+    def test_map(self):
+        extents = [(100, 10), (300, 5), (200, 20)]
+
+        self.assertEqual(list(map_ranges(extents, [[0, 35]])),
+                         [(0, 100, 10), (0, 300, 5), (0, 200, 20)])
+        self.assertEqual(list(map_ranges(extents, [[5, 8], [9, 12],
+                                                   [16, 17], [34, 40]])),
+                         [(0, 105, 3), (1, 109, 1), (1, 300, 2),
+                          (2, 201, 1), (3, 219, 1)])
+        self.assertEqual(list(map_ranges([], [[0, 1]])), [])
+
 
 class GuidTestCase(TestCase):
     def test_main(self):
@@ -0,0 +1,39 @@
+from os.path import dirname
+from subprocess import PIPE, Popen
+from sys import executable
+from unittest import TestCase
+
+# Budget of "python -X importtime -c 'import cfb'" cumulative time
+IMPORT_BUDGET = 0.1
+
+SCRIPT = """
+import sys
+before = set(sys.modules)
+import cfb
+print(" ".join(sorted(set(sys.modules) - before)))
+"""
+
+
+def run():
+    """ Imports cfb in clean interpreter, returns new modules and time """
+    process = Popen([executable, "-X", "importtime", "-c", SCRIPT],
+                    stdout=PIPE, stderr=PIPE, cwd=dirname(dirname(__file__)),
+                    universal_newlines=True)
+    output, errors = process.communicate()
+    cumulative = [int(line.split("|")[1]) for line in errors.splitlines()
+                  if line.split("|")[-1].strip() == "cfb"]
+    return set(output.split()), cumulative[0] / 1e6
+
+
+class ImportTestCase(TestCase):
+    def test_lazy_modules(self):
+        modules, _ = run()
+
+        self.assertTrue("cfb.compound" in modules)
+        for name in ("six", "uuid", "datetime", "re", "json", "hashlib",
+                     "tempfile", "cfb.guid", "cfb.properties", "cfb.vba"):
+            self.assertFalse(name in modules, name)
+
+    def test_budget(self):
+        # Best of few runs, the first one could compile bytecode
+        self.assertTrue(min(run()[1] for _ in range(3)) < IMPORT_BUDGET)
@@ -0,0 +1,117 @@
+from struct import pack
+from unittest import TestCase
+from warnings import catch_warnings, simplefilter
+
+from cfb import CfbIO
+from cfb.exceptions import FatalDefect, ReadLimitError
+from cfb.properties import PropertySetStream
+from cfb.vba import VbaProject
+from tests.generator import SyntheticCfb, temporary_file, vba_project
+
+
+class LimitsTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+        self.generated = temporary_file(self)
+        SyntheticCfb(streams=2, stream_size=8192).save(self.generated)
+
+    def patch(self, position, data):
+        with open(self.generated, "r+b") as output:
+            output.seek(position)
+            output.write(data)
+
+    def record(self, path):
+        """ Position of directory record of `path` """
+        with CfbIO(self.generated) as io:
+            entry_id = io.directory.paths[path]
+            sectors = io.directory.sectors
+        return ((sectors[entry_id // 4] + 1) << 9) + entry_id % 4 * 128
+
+    def test_declared_size(self):
+        self.patch(self.record("Stream0001") + 120, pack("<Q", 0x7fff0000))
+
+        with CfbIO(self.generated) as io:
+            me = io["Stream0001"]
+            with catch_warnings(record=True) as caught:
+                simplefilter("always")
+                self.assertEqual(len(me.read()), 8192)
+            self.assertEqual(me.stored_size, 8192)
+            self.assertTrue(any("holds 8192 bytes" in str(item.message)
+                                for item in caught))
+
+    def test_cyclic_chain(self):
+        self.patch(self.record("Stream0001") + 120, pack("<Q", 0x7fff0000))
+        with CfbIO(self.generated) as io:
+            entry = io["Stream0001"]
+            sectors = io.chain(entry.sector_start)
+            fat = ((io.difat[0] + 1) << 9) + sectors[-1] * 4
+        # Last sector of stream points back to its first one
+        self.patch(fat, pack("<L", sectors[0]))
+
+        with CfbIO(self.generated, raise_if=FatalDefect) as io:
+            # Cyclic chain is cut on first repeated sector
+            self.assertEqual(io.chain(sectors[0]), sectors)
+            self.assertEqual(len(io["Stream0001"].read()), 8192)
+
+    def test_chain_beyond_file(self):
+        self.patch(self.record("Stream0001") + 120, pack("<Q", 0x7fff0000))
+        with CfbIO(self.generated) as io:
+            sectors = io.chain(io["Stream0001"].sector_start)
+            fat = (io.difat[0] + 1) << 9
+            size = io.size
+        # Chain goes on through FAT entries of sectors beyond end of file
+        self.patch(fat + sectors[-1] * 4, pack("<L", 64))
+        self.patch(fat + 64 * 4, pack("<63L", *range(65, 128)))
+        self.patch(fat + 127 * 4, pack("<l", -2))
+
+        with CfbIO(self.generated, raise_if=FatalDefect) as io:
+            chain = io.chain(sectors[0])
+            self.assertEqual(chain[:len(sectors) + 1], sectors + [64])
+            self.assertEqual(len(chain), -(-size >> 9))
+            self.assertTrue(len(io["Stream0001"].read()) <= size)
+
+    def test_max_read(self):
+        with CfbIO(self.filename, max_read=1024) as io:
+            me = io["1Table"]
+            self.assertRaises(ReadLimitError, me.read)
+            self.assertRaises(ReadLimitError, me.read, 2048)
+            self.assertRaises(ReadLimitError, me.read_ranges,
+                              [(0, 1000), (1200, 100)])
+            self.assertEqual(len(me.read(1000)), 1000)
+
+            chunks = list(me.chunks())
+            self.assertTrue(all(len(chunk) <= 1024 for chunk in chunks))
+            me.seek(0)
+            self.assertEqual(b"".join(chunks), me.read(1024) + me.read(1024))
+
+    def test_whole_stream_readers(self):
+        with CfbIO(self.filename, max_read=128) as io:
+            self.assertRaises(ReadLimitError, PropertySetStream,
+                              io["\x05SummaryInformation"])
+        with CfbIO(self.filename, max_read=1024) as io:
+            PropertySetStream(io["\x05SummaryInformation"])
+
+        SyntheticCfb(streams=0, files=vba_project(
+            {"Module1": "Debug.Print 1\r\n" * 1000})).save(self.generated)
+        with CfbIO(self.generated) as io:
+            size = io.directory.by_path("VBA/dir").size
+        with CfbIO(self.generated, max_read=size - 1) as io:
+            self.assertRaises(ReadLimitError, VbaProject, io)
+        with CfbIO(self.generated, max_read=size) as io:
+            self.assertEqual(len(VbaProject(io).modules), 1)
+
+    def test_nested(self):
+        inner = SyntheticCfb(streams=1, stream_size=8192)
+        SyntheticCfb(streams=0, files={"Inner": inner.build()})\
+            .save(self.generated)
+
+        with CfbIO(self.generated, max_read=4096) as io:
+            me = io.open_nested("Inner")
+            self.assertEqual(me.max_read, 4096)
+            self.assertRaises(ReadLimitError, me["Stream0000"].read)
+            self.assertEqual(b"".join(me["Stream0000"].chunks()),
+                             inner.data("Stream0000"))
+            self.assertEqual(io.open_nested("Inner", max_read=None).max_read,
+                             None)
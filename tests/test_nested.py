@@ -0,0 +1,72 @@
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO
+from cfb.exceptions import FatalDefect
+from cfb.nested import NestedCfb
+from tests.generator import SyntheticCfb, temporary_file
+
+
+class NestedCfbTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+        self.inner = SyntheticCfb(streams=2, stream_size=5000, mini_streams=2)
+        middle = SyntheticCfb(streams=1, fragmentation=1.0, files={
+            "ObjectPool/Inner": self.inner.build(),
+            "Native": b"\x10\x00\x00\x00" + self.inner.build()})
+        self.middle = middle.build()
+        self.filename = SyntheticCfb(
+            streams=1, fragmentation=1.0, seed=3,
+            files={"Attachment": self.middle}).save(temporary_file(self))
+
+    def test_main(self):
+        with CfbIO(self.filename, stats=True) as io:
+            self.assertTrue(len(io["Attachment"].extents) > 1)
+
+            middle = io.open_nested("Attachment", stats=True)
+            self.assertTrue(isinstance(middle, NestedCfb))
+            self.assertEqual(middle.size, len(self.middle))
+            self.assertEqual(repr(middle),
+                             '<NestedCfb "%s!Attachment">' % self.filename)
+
+            me = middle.open_nested(middle.directory.by_path(
+                "ObjectPool/Inner"), stats=True)
+            self.assertEqual(me.name,
+                             "%s!Attachment!Inner" % self.filename)
+            self.assertEqual(sorted(me.directory.paths), sorted(
+                self.inner.paths))
+            reads = middle.stats.reads
+            for path in self.inner.paths:
+                self.assertEqual(me.directory.by_path(path).read(),
+                                 self.inner.data(path))
+
+            # Inner file reads outermost one directly
+            self.assertTrue(me.outermost is io)
+            self.assertEqual(middle.stats.reads, reads)
+            self.assertTrue(all(position + length <= io.size
+                                for position, length in me.extents))
+
+            # Embedded files are never read whole
+            self.assertTrue(io.stats.bytes_read < len(self.middle))
+            self.assertTrue(me.stats.reads > 0)
+
+            me.close()
+            self.assertRaises(ValueError, me.read_at, 0, 512)
+
+    def test_offset(self):
+        io = CfbIO(self.filename)
+        middle = io.open_nested("Attachment")
+        me = middle.open_nested("Native", 4)
+
+        self.assertEqual(me.size, len(self.inner.build()))
+        self.assertEqual(me["Stream0001"].read(),
+                         self.inner.data("Stream0001"))
+
+    def test_parent_kept(self):
+        me = CfbIO(self.filename).open_nested("Attachment")
+        self.assertEqual(me.directory.by_path("Native").size,
+                         len(self.inner.build()) + 4)
+
+    def test_not_cfb(self):
+        io = CfbIO("tests/data/simple.doc")
+        self.assertRaises(FatalDefect, io.open_nested, "WordDocument")
@@ -0,0 +1,100 @@
+from os import listdir, remove
+from os.path import isdir, join
+from shutil import copy, rmtree
+from tempfile import mkdtemp
+from unittest import TestCase, skipUnless
+from warnings import simplefilter
+
+from cfb import CfbIO, CfbPool
+from cfb.exceptions import CfbError
+from cfb.pool import PooledCfb
+
+
+class CfbPoolTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+        self.directory = mkdtemp()
+        self.names = [join(self.directory, "%02d.doc" % i) for i in range(8)]
+        for name in self.names:
+            copy(self.filename, name)
+        with CfbIO(self.filename) as io:
+            self.data = io["1Table"].read()
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def test_main(self):
+        with CfbPool(max_open=3) as pool:
+            files = [pool.open(name) for name in self.names]
+            self.assertTrue(isinstance(files[0], PooledCfb))
+            self.assertEqual(len(pool), 3)
+
+            for me in files + files:
+                me["1Table"].seek(0)
+                self.assertEqual(me["1Table"].read(), self.data)
+                self.assertTrue(len(pool) <= 3)
+
+            self.assertEqual(pool.evictions, pool.opens - 3)
+            self.assertEqual(pool.as_dict()["open"], 3)
+            self.assertTrue(pool.hits > 0)
+        self.assertEqual(len(pool), 0)
+
+        # Descriptors are reopened on demand
+        self.assertEqual(files[0]["WordDocument"].read(4),
+                         b"\xec\xa5\x01\x01")
+        self.assertEqual(repr(files[0]), '<PooledCfb "%s">' % self.names[0])
+        self.assertRaises(ValueError, CfbPool, 0)
+
+    def test_options(self):
+        pool = CfbPool(max_open=1, lazy=True)
+        me = pool.open(self.names[0], stats=True)
+
+        self.assertEqual(len(me.directory), 1)
+        self.assertEqual(me["1Table"].read(), self.data)
+        self.assertTrue(me.stats.reads > 0)
+        self.assertEqual(me.digests(), CfbIO(self.filename).digests())
+
+        me.close()
+        self.assertRaises(ValueError, me.read_at, 0, 1)
+        pool.close()
+
+    def test_changed(self):
+        pool = CfbPool(max_open=1)
+        me = pool.open(self.names[0])
+        pool.open(self.names[1])
+
+        remove(self.names[0])
+        with open(self.names[0], "wb") as output:
+            output.write(b"\0" * 512)
+        self.assertRaises(CfbError, me.read_at, 0, 512)
+        pool.close()
+
+    def test_close_in_use(self):
+        pool = CfbPool(max_open=2)
+        me = pool.open(self.names[0])
+        with pool.descriptor(self.names[0]) as (opened, _):
+            pool.close()
+            # Reader's descriptor stays open until it's released
+            self.assertEqual(len(pool), 0)
+            self.assertFalse(opened.closed)
+            self.assertEqual(len(opened.read(512)), 512)
+        self.assertTrue(opened.closed)
+
+        # File reopens descriptor on demand
+        self.assertEqual(len(me.read_at(0, 512)), 512)
+        self.assertEqual(pool.opens, 2)
+        pool.close()
+
+    @skipUnless(isdir("/proc/self/fd"), "needs /proc/self/fd")
+    def test_descriptors(self):
+        before = len(listdir("/proc/self/fd"))
+        pool = CfbPool(max_open=2)
+        files = [pool.open(name) for name in self.names * 4]
+        for me in files:
+            me["WordDocument"].read()
+
+        self.assertEqual(len(listdir("/proc/self/fd")), before + 2)
+        pool.close()
+        self.assertEqual(len(listdir("/proc/self/fd")), before)
@@ -0,0 +1,73 @@
+from io import BytesIO
+from struct import pack
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO, probe
+from tests.generator import SyntheticCfb, temporary_file
+
+
+class ProbeTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+
+    def test_file(self):
+        me = probe(self.filename)
+        io = CfbIO(self.filename)
+
+        self.assertEqual(me.version, io.header.version)
+        self.assertEqual(me.sector_size, 512)
+        self.assertEqual(me.fat_sectors, io.header.fat_sectors_count)
+        self.assertEqual(me.directory_start, 15)
+        self.assertEqual(me.root_clsid, io.root.clsid)
+        self.assertEqual(str(me.root_clsid),
+                         "06090200-0000-0000-c000-000000000046")
+        self.assertEqual(me.root_modified, None)
+        self.assertEqual(me.size, io.size)
+        self.assertRaises(AttributeError, setattr, me, "size", 0)
+
+    def test_sources(self):
+        with open(self.filename, "rb") as source:
+            data = source.read()
+            source.seek(100)
+            self.assertEqual(probe(source), probe(self.filename))
+
+        self.assertEqual(probe(data), probe(self.filename))
+        self.assertEqual(probe(BytesIO(data)).size, None)
+
+        me = probe(SyntheticCfb(version=4).build())
+        self.assertEqual(me.version, (4, 0x3e))
+        self.assertEqual(me.sector_size, 4096)
+
+    def test_not_cfb(self):
+        self.assertEqual(probe("setup.py"), None)
+        self.assertEqual(probe(b""), None)
+        self.assertEqual(probe(b"\xd0\xcf\x11\xe0"), None)
+
+        # Header only, root entry is missing
+        with open(self.filename, "rb") as source:
+            me = probe(source.read(512))
+        self.assertEqual(me.root_clsid, None)
+        self.assertEqual(me.size, 512)
+
+    def test_hostile(self):
+        with open(self.filename, "rb") as source:
+            data = bytearray(source.read())
+        # Sector shift is neither 9 nor 12
+        for shift in (0xffff, 64, 7):
+            data[30:32] = pack("<H", shift)
+            filename = temporary_file(self)
+            with open(filename, "wb") as output:
+                output.write(data)
+            self.assertEqual(probe(bytes(data)), None)
+            self.assertEqual(probe(filename), None)
+
+        # Root modification time out of datetime range
+        data[30:32] = pack("<H", 9)
+        data[(15 + 1) * 512 + 108:(15 + 1) * 512 + 116] = \
+            pack("<Q", 0xfffffffffffffff0)
+        me = probe(bytes(data))
+        self.assertEqual(me.sector_size, 512)
+        self.assertEqual(me.root_modified, None)
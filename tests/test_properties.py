@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from struct import pack
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO
+from cfb.exceptions import ErrorDefect, FatalDefect
+from cfb.properties import PropertySetStream, FMTID_SUMMARY_INFORMATION, \
+    FMTID_DOC_SUMMARY_INFORMATION, FMTID_USER_DEFINED_PROPERTIES
+
+
+class MockEntry(object):
+    minimum_defect = ErrorDefect
+
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+
+    def check_budget(self, size):
+        pass
+
+    def chunks(self):
+        yield self.data
+
+
+def property_set(*properties):
+    """ Builds property set stream of SummaryInformation format """
+    values, offsets = b"", []
+    table = 8 + 8 * len(properties)
+    for pid, kind, value in properties:
+        offsets.append(pack("<LL", pid, table + len(values)))
+        value = pack("<HH", kind, 0) + value
+        values += value + b"\0" * (-len(value) % 4)
+    body = b"".join(offsets) + values
+    return pack("<HH4s16sL16sL", 0xfffe, 0, b"\0" * 4, b"\0" * 16, 1,
+                FMTID_SUMMARY_INFORMATION.bytes, 48) + \
+        pack("<LL", 8 + len(body), len(properties)) + body
+
+
+class PropertySetStreamTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+
+    def test_simple(self):
+        io = CfbIO("tests/data/simple.doc")
+        me = io["\x05SummaryInformation"].properties()
+
+        self.assertEqual(len(me), 1)
+        summary = me[FMTID_SUMMARY_INFORMATION]
+        self.assertEqual(summary, me[0])
+        self.assertEqual(summary.ids(), [1, 9, 10, 11, 12, 13])
+        self.assertEqual(summary["codepage"], 65001)
+        self.assertEqual(summary.codec, "utf-8")
+        self.assertEqual(summary["revision"], "1")
+        self.assertEqual(summary["edit_time"], timedelta(0))
+        self.assertEqual(summary[11], None)
+        self.assertEqual(summary["created"], datetime(2013, 10, 7, 14, 9, 40))
+        self.assertFalse("title" in summary)
+        self.assertEqual(summary.get("title", "-"), "-")
+        self.assertRaises(KeyError, lambda: summary["title"])
+
+        me = io["\x05DocumentSummaryInformation"].properties()
+        self.assertEqual([item.fmtid for item in me.sets],
+                         [FMTID_DOC_SUMMARY_INFORMATION,
+                          FMTID_USER_DEFINED_PROPERTIES])
+        self.assertEqual(me[1].as_dict(), {1: 65001})
+
+    def test_types(self):
+        title = "Привет".encode("cp1251")
+        me = MockEntry(property_set(
+            (1, 0x02, pack("<h", 1251)),
+            (2, 0x1e, pack("<L", 7) + title + b"\0"),
+            (4, 0x1f, pack("<L", 4) + "Bob\0".encode("utf-16-le")),
+            (14, 0x03, pack("<l", -5)),
+            (19, 0x0b, pack("<H", 0xffff)),
+            (40, 0x101e, pack("<L", 2) + pack("<L", 2) + b"a\0" +
+             pack("<L", 3) + b"bc\0"),
+            (41, 0x100c, pack("<L", 2) + pack("<HHL", 0x1e, 0, 2) +
+             b"x\0\0\0" + pack("<HHl", 0x03, 0, 7)),
+            (42, 0x41, pack("<L", 3) + b"\1\2\3"),
+            (43, 0x99, b"")))
+
+        summary = PropertySetStream(me)[0]
+        self.assertEqual(summary.codec, "cp1251")
+        self.assertEqual(summary["title"], "Привет")
+        self.assertEqual(summary["author"], "Bob")
+        self.assertEqual(summary["pages"], -5)
+        self.assertEqual(summary["security"], True)
+        self.assertEqual(summary[40], ["a", "bc"])
+        self.assertEqual(summary[41], ["x", 7])
+        self.assertEqual(summary[42], b"\1\2\3")
+        self.assertRaises(ErrorDefect, lambda: summary[43])
+
+    def test_defects(self):
+        self.assertRaises(FatalDefect, PropertySetStream, MockEntry(b""))
+        data = property_set((1, 0x02, pack("<h", 1252)))
+        self.assertRaises(FatalDefect, PropertySetStream,
+                          MockEntry(b"\0\0" + data[2:]))
+        self.assertRaises(ErrorDefect, PropertySetStream,
+                          MockEntry(data[:60]))
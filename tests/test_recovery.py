@@ -0,0 +1,92 @@
+from os.path import getsize
+from shutil import copyfile
+from struct import pack
+from unittest import TestCase
+from warnings import catch_warnings, simplefilter
+
+from cfb import CfbIO
+from cfb.exceptions import FatalDefect
+from cfb.recovery import Finding
+from tests.generator import SyntheticCfb, temporary_file
+
+
+class ScanUnallocatedTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+        self.filename = temporary_file(self)
+
+    def test_simple(self):
+        io = CfbIO("tests/data/simple.doc")
+        me = list(io.scan_unallocated())
+
+        self.assertEqual(me[0], Finding("slack", 1, "\x01CompObj", True,
+                                        [(2154, 22)]))
+        self.assertEqual(set(finding.kind for finding in me),
+                         set(["slack", "free"]))
+        for finding in me:
+            if finding.kind == "slack":
+                entry = io[finding.entry_id]
+                self.assertEqual(sum(length for _, length in finding.extents),
+                                 64 - entry.size % 64)
+                self.assertEqual(sum(entry.extents[-1]),
+                                 finding.extents[0][0])
+
+    def test_deleted(self):
+        generator = SyntheticCfb(streams=3, stream_size=5000,
+                                 mini_streams=2, fragmentation=0.5)
+        data = bytearray(generator.build())
+        with open(self.filename, "wb") as output:
+            output.write(data)
+
+        io = CfbIO(self.filename)
+        entry = io.directory.by_path("Stream0001")
+        extents = entry.extents
+        position = ((io.directory.sectors[0] + 1) << 9) + entry.id * 128
+        io.close()
+
+        # Type of entry is set to unallocated, its sectors stay in FAT
+        data[position + 66] = 0
+        with open(self.filename, "wb") as output:
+            output.write(data)
+
+        io = CfbIO(self.filename)
+        me = list(io.scan_unallocated())
+        kinds = [finding.kind for finding in me]
+
+        self.assertEqual(me[kinds.index("deleted")],
+                         Finding("deleted", 2, "Stream0001", False, extents))
+        self.assertEqual(kinds.count("slack"), 4)
+        orphans = [finding for finding in me if finding.kind == "orphan"]
+        self.assertEqual(len(orphans), 1)
+        self.assertEqual(sum(length for _, length in orphans[0].extents),
+                         10 * 512)
+        self.assertEqual(
+            b"".join(io.read_at(*extent) for extent in extents)[:5000],
+            generator.data("Stream0001"))
+        io.close()
+
+    def test_out_of_file(self):
+        copyfile("tests/data/simple.doc", self.filename)
+        with open(self.filename, "r+b") as output:
+            # Directory chain goes out of FAT
+            output.seek(512 + 16 * 4)
+            output.write(pack("<L", 5000))
+            # Deleted entry starts at sector beyond end of file
+            output.seek(512 + 100 * 4)
+            output.write(pack("<L", 0xfffffffe))
+            output.seek(((15 + 1) << 9) + 6 * 128 + 66)
+            output.write(b"\0")
+            output.seek(((15 + 1) << 9) + 6 * 128 + 116)
+            output.write(pack("<L", 100))
+
+        with CfbIO(self.filename, raise_if=FatalDefect) as io, \
+                catch_warnings(record=True) as caught:
+            simplefilter("always")
+            me = list(io.scan_unallocated())
+
+        self.assertTrue(any("out of allocation table" in str(item.message)
+                            for item in caught))
+        self.assertTrue("deleted" in [finding.kind for finding in me])
+        for finding in me:
+            for position, length in finding.extents:
+                self.assertTrue(position + length <= getsize(self.filename))
@@ -0,0 +1,59 @@
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO, Stats
+
+
+class StatsTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+
+    def test_disabled(self):
+        io = CfbIO(self.filename)
+
+        self.assertTrue(io.stats is None)
+        self.assertFalse("read" in vars(io))
+        self.assertFalse("seek" in vars(io))
+
+    def test_counters(self):
+        io = CfbIO(self.filename, stats=True)
+        me = io.stats
+
+        self.assertEqual(me.entries_parsed, 7)
+        self.assertTrue(me.reads > 0)
+        self.assertTrue(me.seeks > 0)
+        self.assertTrue(me.bytes_read >= 76 + 7 * 128)
+        self.assertTrue("header" in me.phases)
+        self.assertTrue("directory" in me.phases)
+
+        reads, hops, hits = me.reads, me.minifat_hops, me.cache_hits
+        entry = io["1Table"]
+        self.assertEqual(me.cache_hits, hits + 1)
+
+        entry.read()
+        # Mini stream entries read their data through Root Entry
+        self.assertTrue(me.entry_reads > 1)
+        self.assertTrue(me.reads > reads)
+        self.assertTrue(me.minifat_hops > hops)
+        self.assertTrue(me.fat_hops > 0)
+        self.assertTrue("read" in me.phases)
+
+        me.reset()
+        self.assertEqual(me.as_dict()["reads"], 0)
+        self.assertEqual(me.as_dict()["phases"], {})
+
+    def test_export(self):
+        exported = []
+        me = Stats(exporter=lambda *args: exported.append(args))
+
+        io = CfbIO(self.filename, stats=me)
+        self.assertEqual(io.stats, me)
+        self.assertEqual(exported, [])
+
+        io.close()
+        io.close()
+        self.assertEqual(len(exported), 1)
+        self.assertEqual(exported[0][0], self.filename)
+        self.assertEqual(exported[0][1]["entries_parsed"], 7)
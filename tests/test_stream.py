@@ -0,0 +1,122 @@
+from os import fdopen, pipe
+from io import BytesIO
+from threading import Thread
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO, CfbStream
+from cfb.stream import Spool
+from tests.generator import SyntheticCfb
+
+
+class NonSeekable(object):
+    def __init__(self, data):
+        self.data = BytesIO(data)
+        self.name = "<pipe>"
+        self.sizes = []
+
+    def read(self, size=-1):
+        self.sizes.append(size)
+        return self.data.read(size)
+
+
+class SpoolTestCase(TestCase):
+    def test_main(self):
+        me = Spool(NonSeekable(b"0123456789" * 10), threshold=50,
+                   chunk_size=4)
+
+        self.assertEqual(me.read(3), b"012")
+        self.assertEqual(me.length, 4)
+        self.assertEqual(me.seek(20), 20)
+        self.assertEqual(me.length, 4)
+        self.assertEqual(me.read(5), b"01234")
+        self.assertEqual(me.length, 28)
+        self.assertFalse(me.spilled)
+        self.assertEqual(me.size > 100, True)
+
+        self.assertEqual(me.seek(-10, 2), 90)
+        self.assertTrue(me.finished)
+        self.assertTrue(me.spilled)
+        self.assertEqual(me.size, 100)
+        self.assertEqual(me.read(), b"0123456789")
+        self.assertEqual(me.read(10), b"")
+        self.assertEqual(me.seek(-95, 1), 5)
+        self.assertEqual(me.read(7), b"5678901")
+        self.assertRaises(ValueError, me.seek, -1)
+
+        me.close()
+        self.assertTrue(me.closed)
+
+    def test_far_seek(self):
+        source = NonSeekable(bytes(range(256)) * 4096)
+        me = Spool(source, threshold=2 ** 16, chunk_size=2 ** 12)
+
+        me.seek(2 ** 19)
+        self.assertEqual(me.read(4), b"\0\1\2\3")
+        # Input is pulled by blocks and spilled once threshold is crossed
+        self.assertEqual(max(source.sizes), 2 ** 12)
+        self.assertTrue(me.spilled)
+        self.assertEqual(me.length, 2 ** 19 + 2 ** 12)
+
+
+class CfbStreamTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+
+    def test_main(self):
+        with open(self.filename, "rb") as source:
+            me = CfbStream(NonSeekable(source.read()))
+        io = CfbIO(self.filename)
+
+        self.assertEqual(repr(me), '<CfbStream "<pipe>">')
+        self.assertEqual(me.header.version, io.header.version)
+        self.assertEqual(me.directory.paths, io.directory.paths)
+        for path in io.directory.paths:
+            self.assertEqual(me.directory.by_path(path).read(),
+                             io.directory.by_path(path).read())
+        me.close()
+
+    def test_incremental(self):
+        generator = SyntheticCfb(streams=8, stream_size=2 ** 16,
+                                 mini_streams=8, storages=2)
+        data = generator.build()
+        me = CfbStream(NonSeekable(data), threshold=2 ** 16, chunk_size=512)
+
+        # Header, FAT and first directory sector only
+        self.assertTrue(me.length < len(data) // 20)
+        self.assertEqual(me.header.sector_size, 512)
+
+        paths = [path for path, _ in me.directory.walk()]
+        self.assertEqual(len(paths), 18)
+        self.assertTrue(me.length < len(data) // 10)
+        self.assertFalse(me.spilled)
+
+        self.assertEqual(me.directory.by_path("Storage01/Mini0001").read(),
+                         generator.data("Storage01/Mini0001"))
+        self.assertTrue(me.length < len(data) // 10)
+
+        for path in generator.paths:
+            entry = me.directory.by_path(path)
+            entry.seek(0)
+            self.assertEqual(entry.read(), generator.data(path))
+        self.assertTrue(me.spilled)
+
+    def test_pipe(self):
+        generator = SyntheticCfb(streams=4, stream_size=10000)
+        reader, writer = pipe()
+
+        def write():
+            with fdopen(writer, "wb") as output:
+                output.write(generator.build())
+
+        thread = Thread(target=write)
+        thread.start()
+        with fdopen(reader, "rb") as source:
+            me = CfbStream(source, lazy=False)
+            self.assertEqual(len(me), 5)
+            self.assertEqual(me["Stream0003"].read(),
+                             generator.data("Stream0003"))
+            me.close()
+        thread.join()
@@ -0,0 +1,104 @@
+from json import loads
+from io import StringIO
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO
+from cfb.tracing import Tracer, TimelineTracer, OpenTelemetryTracer
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.calls = []
+
+    def start(self, span):
+        self.calls.append(("start", span.name, span.entry_id))
+
+    def end(self, span):
+        self.calls.append(("end", span.name, span.entry_id))
+
+
+class TracingTestCase(TestCase):
+    filename = "tests/data/simple.doc"
+
+    def setUp(self):
+        simplefilter("ignore")
+
+    def test_hooks(self):
+        me = RecordingTracer()
+        io = CfbIO(self.filename, tracer=me)
+
+        self.assertEqual(me.calls[:2], [("start", "header", None),
+                                        ("end", "header", None)])
+        self.assertTrue(("start", "directory", None) in me.calls)
+        self.assertTrue(("end", "entry", 6) in me.calls)
+        self.assertTrue(("end", "chain", None) in me.calls)
+
+        # Every started span is ended in reverse order
+        stack = []
+        for kind, name, entry_id in me.calls:
+            if kind == "start":
+                stack.append((name, entry_id))
+            else:
+                self.assertEqual(stack.pop(), (name, entry_id))
+        self.assertEqual(stack, [])
+
+        del me.calls[:]
+        io["WordDocument"].read(10)
+        self.assertEqual(me.calls[0], ("start", "read", 5))
+        self.assertEqual(me.calls[-1], ("end", "read", 5))
+
+    def test_timeline(self):
+        me = TimelineTracer()
+        io = CfbIO(self.filename, tracer=me, stats=True)
+        io["1Table"].read()
+
+        names = set(span.name for _, span in me.spans)
+        self.assertEqual(names, set(["header", "directory", "entry", "chain",
+                                     "fat", "read"]))
+        self.assertTrue("read" in io.stats.phases)
+
+        output = StringIO()
+        me.dump(output)
+        events = loads(output.getvalue())["traceEvents"]
+        self.assertEqual(len(events), len(me.spans))
+
+        read = [event for event in events if event["name"] == "read"][-1]
+        self.assertEqual(read["ph"], "X")
+        self.assertEqual(read["args"], {"filename": self.filename,
+                                        "entry_id": 3, "offset": 0,
+                                        "size": 1681})
+        self.assertTrue(read["dur"] >= 0)
+
+        # Span gets range really read, not requested one
+        io["1Table"].seek(1000)
+        io["1Table"].read(5000)
+        self.assertEqual((me.spans[-1][1].offset, me.spans[-1][1].size),
+                         (1000, 681))
+
+    def test_open_telemetry(self):
+        class FakeSpan(object):
+            def __init__(self, log, name, attributes):
+                self.log = log
+                self.name = name
+                log.append(("start", name, attributes))
+
+            def end(self):
+                self.log.append(("end", self.name))
+
+        class FakeTracer(object):
+            def __init__(self):
+                self.log = []
+
+            def start_span(self, name, attributes=None):
+                return FakeSpan(self.log, name, attributes)
+
+        tracer = FakeTracer()
+        CfbIO(self.filename, tracer=OpenTelemetryTracer(tracer))
+
+        self.assertEqual(tracer.log[0], ("start", "cfb.header",
+                                         {"filename": self.filename}))
+        self.assertEqual(tracer.log[1], ("end", "cfb.header"))
+        self.assertTrue(("start", "cfb.entry",
+                         {"filename": self.filename, "entry_id": 1,
+                          "offset": 8320, "size": 128}) in tracer.log)
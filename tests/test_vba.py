@@ -0,0 +1,71 @@
+from unittest import TestCase
+from warnings import simplefilter
+
+from cfb import CfbIO
+from cfb.exceptions import ErrorDefect
+from cfb.vba import VbaProject, Module, decompress, iter_decompress
+from tests.generator import SyntheticCfb, compress, temporary_file, \
+    vba_project
+
+SOURCE = 'Attribute VB_Name = "Module1"\r\n' \
+    'Sub Hello()\r\n    MsgBox "Привет, мир! " & 42\r\nEnd Sub\r\n'
+
+
+class DecompressTestCase(TestCase):
+    def test_vector(self):
+        # Literals "abc" and copy token of 6 bytes at offset 3
+        self.assertEqual(decompress(b"\x01\x05\xb0\x08abc\x03\x20"),
+                         b"abcabcabc")
+
+    def test_round_trip(self):
+        for data in (b"", b"a", b"abc" * 3000, bytes(bytearray(range(256)))
+                     * 20, (SOURCE * 500).encode("utf-8")):
+            self.assertEqual(decompress(compress(data)), data)
+
+    def test_streaming(self):
+        data = (SOURCE * 500).encode("utf-8")
+        container = compress(data)
+        parts = [container[i:i + 7] for i in range(0, len(container), 7)]
+
+        me = list(iter_decompress(parts))
+        self.assertTrue(len(me) > 1)
+        self.assertTrue(all(len(part) <= 4096 for part in me))
+        self.assertEqual(b"".join(me), data)
+
+    def test_uncompressed_chunk(self):
+        data = bytes(bytearray(range(256))) * 16
+        self.assertEqual(decompress(b"\x01\xff\x3f" + data), data)
+
+    def test_defects(self):
+        self.assertRaises(ErrorDefect, decompress, b"\x02\x05\xb0")
+        self.assertRaises(ErrorDefect, decompress, b"\x01\x05\x00\x00abc")
+        self.assertRaises(ErrorDefect, decompress, b"\x01\x03\xb0\x01\x03\x20")
+
+
+class VbaProjectTestCase(TestCase):
+    def setUp(self):
+        simplefilter("ignore")
+        self.filename = temporary_file(self)
+        SyntheticCfb(streams=1, files=vba_project(
+            {"Module1": SOURCE.replace("Привет, мир", "Hello"),
+             "Module2": SOURCE * 300}, codepage=1251)).save(self.filename)
+        self.io = CfbIO(self.filename)
+
+    def tearDown(self):
+        self.io.close()
+
+    def test_main(self):
+        me = VbaProject(self.io)
+
+        self.assertEqual(me.path, "VBA")
+        self.assertEqual(me.codepage, 1251)
+        self.assertEqual(me.modules, [Module("Module1", "Module1", 37, True),
+                                      Module("Module2", "Module2", 37, True)])
+        self.assertTrue("Hello" in me.read("Module1"))
+        self.assertEqual(me.read("Module2"), SOURCE * 300)
+        self.assertEqual("".join(me.code("Module2", chunk_size=100)),
+                         SOURCE * 300)
+        self.assertRaises(KeyError, me.read, "Module3")
+
+    def test_missing(self):
+        self.assertRaises(KeyError, VbaProject, CfbIO("tests/data/simple.doc"))